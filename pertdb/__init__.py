@@ -28,6 +28,8 @@ Auxiliary registries:
    :toctree: .
 
    PerturbationTarget
+   CompoundElement
+   GeneticPerturbationSeed
 
 Helper types:
 
@@ -37,37 +39,97 @@ Helper types:
    GeneticPerturbationSystem
    BiologicType
 
+Settings:
+
+.. autosummary::
+   :toctree: .
+
+   settings
+
+Bulk loading:
+
+.. autosummary::
+   :toctree: .
+
+   bulk_load
+   restore_indexes
+   io
+
 """
 
 __version__ = "2.0.2"
 
-from lamindb_setup import _check_instance_setup
+import importlib
+from typing import TYPE_CHECKING
 
+from ._bulk_load import bulk_load, restore_indexes
+from ._settings import settings
 from .types import BiologicType, GeneticPerturbationSystem
 
-_check_instance_setup(from_module="pertdb")
-
-
-from .models import (
-    Biologic,
-    CombinationPerturbation,
-    Compound,
-    CompoundPerturbation,
-    EnvironmentalPerturbation,
-    GeneticPerturbation,
-    PerturbationTarget,
-)
+if TYPE_CHECKING:
+    from .models import (
+        Biologic,
+        CombinationPerturbation,
+        Compound,
+        CompoundElement,
+        CompoundPerturbation,
+        EnvironmentalPerturbation,
+        GeneticPerturbation,
+        GeneticPerturbationSeed,
+        PerturbationTarget,
+    )
+
+# registries are imported on first access so that importing lightweight parts of the
+# package, like `pertdb.types`, doesn't connect to an instance and set up Django
+_REGISTRIES = {
+    "Biologic",
+    "CombinationPerturbation",
+    "Compound",
+    "CompoundElement",
+    "CompoundPerturbation",
+    "EnvironmentalPerturbation",
+    "GeneticPerturbation",
+    "GeneticPerturbationSeed",
+    "PerturbationTarget",
+}
 
 __all__ = [
     # registries
     "Biologic",
     "CombinationPerturbation",
     "Compound",
+    "CompoundElement",
     "CompoundPerturbation",
     "EnvironmentalPerturbation",
     "GeneticPerturbation",
+    "GeneticPerturbationSeed",
     "PerturbationTarget",
     # helper types
     "BiologicType",
     "GeneticPerturbationSystem",
+    # settings
+    "settings",
+    # bulk loading
+    "bulk_load",
+    "restore_indexes",
+    "io",
 ]
+
+
+def __getattr__(name: str):
+    if name == "io":
+        return importlib.import_module(".io", __name__)
+    if name in _REGISTRIES or name == "models":
+        from lamindb_setup import _check_instance_setup
+
+        _check_instance_setup(from_module="pertdb")
+
+        models = importlib.import_module(".models", __name__)
+        value = models if name == "models" else getattr(models, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
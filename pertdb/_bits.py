@@ -0,0 +1,24 @@
+"""Bit counting over NumPy arrays."""
+
+from __future__ import annotations
+
+import numpy as np
+
+if hasattr(np, "bitwise_count"):
+    bitcount = np.bitwise_count
+
+    def bitcount_words(words: np.ndarray) -> np.ndarray:
+        """Number of set bits per element of an int64 array."""
+        return np.bitwise_count(words)
+
+else:  # numpy < 2
+    _BITCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], np.uint8)
+
+    def bitcount(array: np.ndarray) -> np.ndarray:
+        """Number of set bits per element of a uint8 array."""
+        return _BITCOUNT_TABLE[array]
+
+    def bitcount_words(words: np.ndarray) -> np.ndarray:
+        """Number of set bits per element of an int64 array."""
+        words = np.ascontiguousarray(words)
+        return bitcount(words.view(np.uint8)).reshape(len(words), 8).sum(axis=1)
@@ -0,0 +1,199 @@
+"""Bulk loading with deferred maintenance of secondary indexes.
+
+Most columns of the `pertdb` registries are indexed, so every inserted row
+updates many B-trees. For initial loads of large libraries it's cheaper to drop
+the non-unique indexes, insert all rows and build the indexes once at the end.
+Indexes that the bulk creation methods query to find existing records, see
+:func:`lookup_indexes`, are kept.
+
+The definitions of dropped indexes are stored in the table of
+:class:`~pertdb.models.BulkLoadIndex` in the same transaction that drops them, so
+that any client of the instance can recover an interrupted load with
+:func:`~pertdb.restore_indexes`.
+"""
+
+from __future__ import annotations
+
+import re
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+# the column list of a CREATE INDEX statement, the last parenthesized group
+_COLUMNS = re.compile(r"\(([^()]*)\)[^()]*$")
+
+
+def _tables() -> list[str]:
+    from django.apps import apps
+
+    models = apps.get_app_config("pertdb").get_models(include_auto_created=True)
+    return sorted(model._meta.db_table for model in models)
+
+
+def _columns(sql: str) -> tuple[str, ...]:
+    match = _COLUMNS.search(sql)
+    if match is None:
+        return ()
+    # drop quotes & operator classes like `varchar_pattern_ops`
+    return tuple(column.split()[0].strip('"') for column in match.group(1).split(","))
+
+
+def lookup_indexes() -> set[tuple[str, tuple[str, ...]]]:
+    """Tables and columns of the indexes that bulk creation methods query.
+
+    :meth:`~pertdb.Compound.from_smiles_bulk` and
+    :meth:`~pertdb.GeneticPerturbation.from_guides_bulk` look up existing records
+    per chunk, without these indexes each lookup would scan the table.
+    Saving a perturbation replaces its seeds, which are deleted by the foreign key.
+    """
+    from .models import (
+        Compound,
+        GeneticPerturbation,
+        GeneticPerturbationSeed,
+        PerturbationTarget,
+    )
+
+    return {
+        (Compound._meta.db_table, ("inchikey",)),
+        (Compound._meta.db_table, ("canonical_smiles_hash",)),
+        (GeneticPerturbation._meta.db_table, ("sequence_hash",)),
+        (GeneticPerturbation._meta.db_table, ("canonical_sequence_hash",)),
+        (GeneticPerturbationSeed._meta.db_table, ("kmer", "offset")),
+        (GeneticPerturbationSeed._meta.db_table, ("perturbation_id",)),
+        (PerturbationTarget._meta.db_table, ("name",)),
+    }
+
+
+def secondary_indexes() -> list[dict[str, str]]:
+    """Names, tables and SQL definitions of the non-unique indexes on `pertdb` tables."""
+    from django.db import connection
+
+    tables = _tables()
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            # indexes backing primary keys & unique constraints have no SQL
+            cursor.execute(
+                "SELECT name, tbl_name, sql FROM sqlite_master WHERE type = 'index' "
+                f"AND tbl_name IN ({','.join(['%s'] * len(tables))}) "
+                "AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%%' ORDER BY name",
+                tables,
+            )
+        elif connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT indexname, tablename, indexdef FROM pg_indexes "
+                "WHERE schemaname = current_schema() AND tablename = ANY(%s) "
+                "AND indexdef NOT LIKE 'CREATE UNIQUE%%' ORDER BY indexname",
+                [tables],
+            )
+        else:
+            raise NotImplementedError(
+                f"bulk loading isn't supported for {connection.vendor}"
+            )
+        return [
+            {"name": name, "table": table, "sql": sql}
+            for name, table, sql in cursor.fetchall()
+        ]
+
+
+def _droppable_indexes(keep: Iterable[str] = ()) -> list[dict[str, str]]:
+    keep = set(keep)
+    lookups = lookup_indexes()
+    return [
+        index
+        for index in secondary_indexes()
+        if index["name"] not in keep
+        and (index["table"], _columns(index["sql"])) not in lookups
+    ]
+
+
+def _drop_indexes(keep: Iterable[str] = ()) -> list[dict[str, str]]:
+    from django.db import connection, transaction
+
+    from .models import BulkLoadIndex
+
+    indexes = _droppable_indexes(keep)
+    # journal the definitions in the transaction that drops the indexes so that no
+    # index definition is lost
+    with transaction.atomic():
+        BulkLoadIndex.objects.bulk_create(
+            [BulkLoadIndex(**index) for index in indexes], ignore_conflicts=True
+        )
+        with connection.cursor() as cursor:
+            for index in indexes:
+                cursor.execute(
+                    f"DROP INDEX IF EXISTS {connection.ops.quote_name(index['name'])}"
+                )
+    return indexes
+
+
+def restore_indexes() -> int:
+    """Rebuild the indexes dropped by an interrupted :func:`~pertdb.bulk_load`.
+
+    Called automatically when entering :func:`~pertdb.bulk_load`.
+    The dropped indexes are recorded in the database, so the indexes can be rebuilt
+    from any machine with access to the instance.
+
+    Returns:
+        The number of rebuilt indexes.
+    """
+    from django.db import connection, transaction
+    from lamin_utils import logger
+
+    from .models import BulkLoadIndex
+
+    journal = list(BulkLoadIndex.objects.order_by("name"))
+    if not journal:
+        return 0
+    existing = {index["name"] for index in secondary_indexes()}
+    missing = [index for index in journal if index.name not in existing]
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for index in missing:
+                cursor.execute(index.sql)
+        BulkLoadIndex.objects.filter(id__in=[index.id for index in journal]).delete()
+    if missing:
+        logger.info(f"rebuilt {len(missing)} indexes on pertdb tables")
+    return len(missing)
+
+
+@contextmanager
+def bulk_load(keep: Iterable[str] = ()) -> Iterator[list[dict[str, str]]]:
+    """Defer the maintenance of secondary indexes on `pertdb` tables.
+
+    Drops the non-unique indexes of `pertdb` tables on entering and rebuilds them
+    on exit, also if an exception is raised.
+    Unique constraints remain enforced, and so do the indexes that bulk creation
+    methods query to find existing records, like those on `Compound.inchikey` and
+    `GeneticPerturbation.canonical_sequence_hash`.
+    Queries on other indexed columns are slow inside the context and other processes
+    shouldn't write to `pertdb` tables meanwhile.
+
+    If the process dies before the indexes are rebuilt, they're rebuilt the next
+    time :func:`~pertdb.bulk_load` is entered or :func:`~pertdb.restore_indexes` is
+    called, by any client of the instance.
+
+    Args:
+        keep: Names of further indexes to keep, see the yielded definitions.
+
+    Yields:
+        The definitions of the dropped indexes.
+
+    Example::
+
+        import pertdb
+
+        with pertdb.bulk_load():
+            pertdb.Compound.from_smiles_bulk(names, smiles)
+    """
+    from lamin_utils import logger
+
+    if restore_indexes() > 0:
+        logger.warning("recovered indexes of an interrupted bulk load")
+    indexes = _drop_indexes(keep)
+    logger.info(f"dropped {len(indexes)} indexes on pertdb tables")
+    try:
+        yield indexes
+    finally:
+        restore_indexes()
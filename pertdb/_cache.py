@@ -0,0 +1,177 @@
+"""On-disk cache for the outputs of SMILES standardization.
+
+Entries are keyed by a hash of the raw SMILES, the standardizer configuration,
+the computed fields and the RDKit version, so that changing any of them
+invalidates the cache. The cache lives in the lamin cache directory and is
+shared across instances.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from ._settings import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# bump when the layout of cached values changes
+CACHE_VERSION = 1
+
+# number of hits whose recency is buffered before it's written
+_TOUCH_BATCH_SIZE = 10_000
+
+_caches: dict[tuple[Path, str], StandardizationCache] = {}
+
+
+class StandardizationCache:
+    """A size-bounded SQLite cache with least-recently-used eviction.
+
+    The recency of hits is buffered and written with the next :meth:`set_many` or
+    every few thousand hits. The number of entries is counted once and then
+    tracked from the inserts of this process, only an exceeded bound triggers a
+    count and an eviction down to 90% of `max_entries`. As other processes may
+    share the file, the bound is approximate.
+
+    Args:
+        path: Path of the SQLite file.
+        max_entries: Maximum number of entries, the least recently used are evicted.
+        namespace: Identifies the configuration that produced the cached values.
+    """
+
+    def __init__(self, path: str | Path, max_entries: int, namespace: str):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.namespace = namespace
+        # upper bound of the number of entries, None until counted
+        self._n_entries: int | None = None
+        # last use of hits that isn't written yet
+        self._touched: dict[bytes, float] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS standardization "
+                "(key BLOB PRIMARY KEY, fields TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS standardization_last_used "
+                "ON standardization (last_used)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # a connection per operation keeps the cache usable from several threads
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+
+    def _key(self, smiles: str) -> bytes:
+        return hashlib.blake2b(
+            f"{self.namespace}\0{smiles}".encode(), digest_size=16
+        ).digest()
+
+    def get_many(self, smiles: list[str]) -> dict[str, dict[str, Any]]:
+        """Look up cached fields, returns only the hits."""
+        keys = {self._key(s): s for s in smiles}
+        hits: dict[str, dict[str, Any]] = {}
+        with self._connect() as conn:
+            key_list = list(keys)
+            # stay below SQLite's limit on the number of query parameters
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i : i + 500]
+                rows = conn.execute(
+                    "SELECT key, fields FROM standardization "
+                    f"WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, fields in rows:
+                    hits[keys[key]] = json.loads(fields)
+                    self._touched[key] = time.time()
+        if len(self._touched) >= _TOUCH_BATCH_SIZE:
+            with self._connect() as conn:
+                self._write_touched(conn)
+        return hits
+
+    def _write_touched(self, conn: sqlite3.Connection) -> None:
+        conn.executemany(
+            "UPDATE standardization SET last_used = ? WHERE key = ?",
+            [(last_used, key) for key, last_used in self._touched.items()],
+        )
+        self._touched = {}
+
+    def set_many(self, items: dict[str, dict[str, Any]]) -> None:
+        """Store fields and evict the least recently used entries beyond `max_entries`."""
+        if not items:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            self._write_touched(conn)
+            conn.executemany(
+                "INSERT OR REPLACE INTO standardization VALUES (?, ?, ?)",
+                [(self._key(s), json.dumps(f), now) for s, f in items.items()],
+            )
+            if self._n_entries is None:
+                self._n_entries = self._count(conn)
+            else:
+                # replaced entries are counted too, hence, an upper bound
+                self._n_entries += len(items)
+            if self._n_entries > self.max_entries:
+                self._n_entries = self._count(conn)
+                n_evicted = self._n_entries - (
+                    self.max_entries - self.max_entries // 10
+                )
+                if self._n_entries > self.max_entries:
+                    conn.execute(
+                        "DELETE FROM standardization WHERE key IN (SELECT key FROM "
+                        "standardization ORDER BY last_used LIMIT ?)",
+                        (n_evicted,),
+                    )
+                    self._n_entries -= n_evicted
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COUNT(*) FROM standardization").fetchone()[0]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM standardization")
+        self._n_entries = 0
+        self._touched = {}
+
+
+def get_cache(fields: list[str]) -> StandardizationCache | None:
+    """The standardization cache for the current settings, `None` if it's disabled.
+
+    Args:
+        fields: Names of the fields that are cached.
+    """
+    if not settings.cache_standardization:
+        return None
+    from lamindb_setup import settings as setup_settings
+    from rdkit import rdBase
+
+    namespace = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "rdkit": rdBase.rdkitVersion,
+            "config": settings._standardizer_config(),
+            "fields": fields,
+        },
+        sort_keys=True,
+    )
+    path = Path(setup_settings.cache_dir) / "pertdb" / "standardization.sqlite"
+    if (path, namespace) not in _caches:
+        _caches[(path, namespace)] = StandardizationCache(
+            path, max_entries=settings.cache_max_entries, namespace=namespace
+        )
+    cache = _caches[(path, namespace)]
+    cache.max_entries = settings.cache_max_entries
+    return cache
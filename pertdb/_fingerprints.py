@@ -0,0 +1,338 @@
+"""Fingerprint indexes for structural searches over :class:`~pertdb.Compound`.
+
+Fingerprints are stored as packed bit matrices with one row per compound so that
+similarity and screening can be computed in vectorized form.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+try:
+    from rdkit import Chem, DataStructs
+    from rdkit.Chem import rdFingerprintGenerator
+except ImportError:
+    pass
+
+from ._bits import bitcount
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django.db.models import ExpressionWrapper, QuerySet
+
+FINGERPRINT_SIZE = 2048
+MORGAN_RADIUS = 2
+
+
+@functools.cache
+def _morgan_generator() -> rdFingerprintGenerator.FingerprintGenerator64:
+    return rdFingerprintGenerator.GetMorganGenerator(
+        radius=MORGAN_RADIUS, fpSize=FINGERPRINT_SIZE
+    )
+
+
+def _morgan_fingerprint(mol: Chem.Mol) -> np.ndarray:
+    return _morgan_generator().GetFingerprintAsNumPy(mol)
+
+
+def _pattern_fingerprint(mol: Chem.Mol) -> np.ndarray:
+    # pattern fingerprints of a substructure are bit subsets of those of its superstructures
+    fingerprint = Chem.PatternFingerprint(mol, fpSize=FINGERPRINT_SIZE)
+    array = np.zeros(FINGERPRINT_SIZE, dtype=np.uint8)
+    DataStructs.ConvertToNumpyArray(fingerprint, array)
+    return array
+
+
+# maps fingerprint kinds to functions returning one uint8 per bit
+FINGERPRINTERS: dict[str, Callable[[Chem.Mol], np.ndarray]] = {
+    "morgan": _morgan_fingerprint,
+    "pattern": _pattern_fingerprint,
+}
+
+
+def popcount(fingerprints: np.ndarray) -> np.ndarray:
+    """Number of set bits per row of a packed fingerprint matrix."""
+    return bitcount(fingerprints).sum(axis=-1, dtype=np.int32)
+
+
+def fingerprint_mol(mol: Chem.Mol, kind: str) -> np.ndarray:
+    """Packed fingerprint of a molecule."""
+    return np.packbits(FINGERPRINTERS[kind](mol))
+
+
+def fingerprint_smiles(smiles: list[str], kind: str) -> np.ndarray:
+    """Packed fingerprints of SMILES strings, all-zero rows for invalid SMILES."""
+    fingerprints = np.zeros((len(smiles), FINGERPRINT_SIZE // 8), dtype=np.uint8)
+    for i, s in enumerate(smiles):
+        mol = Chem.MolFromSmiles(s)
+        if mol is not None:
+            fingerprints[i] = fingerprint_mol(mol, kind)
+    return fingerprints
+
+
+def fingerprint_batch(
+    smiles: list[str], kind: str, n_jobs: int | None = None, chunk_size: int = 10_000
+) -> np.ndarray:
+    """Like :func:`fingerprint_smiles` but computes chunks in a process pool."""
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    chunks = [smiles[i : i + chunk_size] for i in range(0, len(smiles), chunk_size)]
+    if n_jobs <= 1 or len(chunks) <= 1:
+        return fingerprint_smiles(smiles, kind)
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks))) as executor:
+        return np.concatenate(
+            list(executor.map(fingerprint_smiles, chunks, [kind] * len(chunks)))
+        )
+
+
+def match_substructure(smiles: list[str], smarts: str) -> list[bool]:
+    """Whether molecules match a SMARTS pattern, `False` for invalid SMILES."""
+    query = Chem.MolFromSmarts(smarts)
+    matches = []
+    for s in smiles:
+        mol = Chem.MolFromSmiles(s)
+        matches.append(mol is not None and mol.HasSubstructMatch(query))
+    return matches
+
+
+def match_substructure_batch(
+    smiles: list[str], smarts: str, n_jobs: int | None = None, chunk_size: int = 2_000
+) -> list[bool]:
+    """Like :func:`match_substructure` but matches chunks in a process pool."""
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    chunks = [smiles[i : i + chunk_size] for i in range(0, len(smiles), chunk_size)]
+    if n_jobs <= 1 or len(chunks) <= 1:
+        return match_substructure(smiles, smarts)
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks))) as executor:
+        results = executor.map(match_substructure, chunks, [smarts] * len(chunks))
+        return [match for chunk in results for match in chunk]
+
+
+class FingerprintIndex:
+    """Packed fingerprints of compounds.
+
+    Args:
+        kind: The kind of fingerprint, a key of :data:`FINGERPRINTERS`.
+        ids: Compound ids, one per row of `fingerprints`.
+        fingerprints: Packed fingerprints of shape `(n_compounds, FINGERPRINT_SIZE // 8)`.
+        state: Identifies the state of the registry the index was built from.
+    """
+
+    def __init__(
+        self, kind: str, ids: np.ndarray, fingerprints: np.ndarray, state: str = ""
+    ):
+        self.kind = kind
+        self.ids = ids
+        self.fingerprints = fingerprints
+        self.popcounts = popcount(fingerprints)
+        self.state = state
+
+    @classmethod
+    def build(
+        cls, queryset: QuerySet, kind: str, n_jobs: int | None = None
+    ) -> FingerprintIndex:
+        """Fingerprint the canonical SMILES of all compounds in a queryset."""
+        rows = queryset.order_by("id").values_list("id", "canonical_smiles")
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        smiles = [row[1] for row in rows]
+        return cls(kind, ids, fingerprint_batch(smiles, kind, n_jobs=n_jobs))
+
+    def extend(self, ids: np.ndarray, fingerprints: np.ndarray) -> None:
+        """Append fingerprints of compounds."""
+        self.ids = np.concatenate([self.ids, ids])
+        self.fingerprints = np.concatenate([self.fingerprints, fingerprints])
+        self.popcounts = np.concatenate([self.popcounts, popcount(fingerprints)])
+
+    def tanimoto(
+        self,
+        query: np.ndarray,
+        threshold: float = 0.0,
+        top_k: int | None = None,
+        chunk_size: int = 65_536,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Compounds most similar to a packed query fingerprint.
+
+        Similarities are computed chunk by chunk to bound the memory of
+        intermediate arrays.
+
+        Returns:
+            Compound ids and similarities, sorted by decreasing similarity.
+        """
+        query_popcount = popcount(query)
+        ids, similarities = [], []
+        for start in range(0, len(self.ids), chunk_size):
+            stop = start + chunk_size
+            common = popcount(self.fingerprints[start:stop] & query)
+            union = self.popcounts[start:stop] + query_popcount - common
+            with np.errstate(divide="ignore", invalid="ignore"):
+                similarity = np.where(union > 0, common / union, 0.0)
+            hits = np.flatnonzero(similarity >= threshold)
+            ids.append(self.ids[start:stop][hits])
+            similarities.append(similarity[hits])
+        ids, similarities = np.concatenate(ids), np.concatenate(similarities)
+        if top_k is not None and len(ids) > top_k:
+            best = np.argpartition(-similarities, top_k - 1)[:top_k]
+            ids, similarities = ids[best], similarities[best]
+        order = np.argsort(-similarities, kind="stable")
+        return ids[order], similarities[order]
+
+    def screen(self, query: np.ndarray, chunk_size: int = 65_536) -> np.ndarray:
+        """Compounds whose fingerprints contain all bits of a packed query fingerprint.
+
+        With pattern fingerprints, this never drops substructure matches.
+
+        Returns:
+            Compound ids.
+        """
+        ids = []
+        for start in range(0, len(self.ids), chunk_size):
+            stop = start + chunk_size
+            covered = ((self.fingerprints[start:stop] & query) == query).all(axis=1)
+            ids.append(self.ids[start:stop][covered])
+        return np.concatenate(ids) if ids else self.ids[:0]
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first so that readers never see partial files
+        tmp_path = path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp_path,
+            ids=self.ids,
+            fingerprints=self.fingerprints,
+            state=np.array(self.state),
+        )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, kind: str) -> FingerprintIndex:
+        with np.load(path) as data:
+            return cls(kind, data["ids"], data["fingerprints"], str(data["state"]))
+
+
+_indexes: dict[tuple[str, str], FingerprintIndex] = {}
+# monotonic time & number of compound writes of this process when an index was
+# last checked against the registry
+_checked: dict[tuple[str, str], tuple[float, int]] = {}
+
+
+def _smiles_checksum() -> ExpressionWrapper:
+    from django.db.models import BigIntegerField, ExpressionWrapper, F, Sum
+
+    # order-sensitive sum of truncated hashes that can't overflow 64 bits
+    return ExpressionWrapper(
+        Sum((F("canonical_smiles_hash") % 1_048_573) * (F("id") % 4_093 + 1)),
+        output_field=BigIntegerField(),
+    )
+
+
+def _registry_state(queryset: QuerySet) -> dict[str, str | int | None]:
+    from django.db.models import Count, Max
+
+    # bulk updates, e.g., by re-standardization, leave `updated_at` unchanged but
+    # change the checksum of canonical SMILES
+    state = queryset.aggregate(
+        n=Count("id"),
+        max_id=Max("id"),
+        updated_at=Max("updated_at"),
+        checksum=_smiles_checksum(),
+    )
+    if state["updated_at"] is not None:
+        state["updated_at"] = state["updated_at"].isoformat()
+    return state
+
+
+def get_index(
+    queryset: QuerySet, kind: str, n_jobs: int | None = None, refresh: bool = False
+) -> FingerprintIndex:
+    """The fingerprint index of a queryset, cached in memory and on disk.
+
+    The index is reused as long as the number of compounds, the maximum id, the
+    latest update time and a checksum of the canonical SMILES don't change. If
+    compounds were only appended, only their fingerprints are computed.
+    As these are aggregates over the registry, they're only checked again after
+    `pertdb.settings.fingerprint_index_ttl` seconds or after this process wrote
+    compounds.
+
+    Args:
+        queryset: Compounds with canonical SMILES.
+        kind: The kind of fingerprint.
+        n_jobs: Number of worker processes for fingerprinting.
+        refresh: Whether to rebuild the index from scratch.
+    """
+    from lamindb_setup import settings as setup_settings
+
+    from . import models
+    from ._settings import settings
+
+    instance_uid = setup_settings.instance.uid
+    key = (instance_uid, kind)
+    checked = _checked.get(key)
+    if (
+        not refresh
+        and key in _indexes
+        and checked is not None
+        and checked[1] == models._n_compound_writes
+        and time.monotonic() - checked[0] < settings.fingerprint_index_ttl
+    ):
+        return _indexes[key]
+    checked = (time.monotonic(), models._n_compound_writes)
+    path = (
+        Path(setup_settings.cache_dir)
+        / "pertdb"
+        / f"{instance_uid}_{kind}_fingerprints.npz"
+    )
+    state = json.dumps(_registry_state(queryset), sort_keys=True)
+    index = None if refresh else _indexes.get(key)
+    if index is None and not refresh and path.exists():
+        index = FingerprintIndex.load(path, kind)
+    if index is not None and index.state != state:
+        index = _extend_appended(index, queryset, state, n_jobs)
+        if index is not None:
+            index.save(path)
+    if index is None:
+        index = FingerprintIndex.build(queryset, kind, n_jobs=n_jobs)
+        index.state = state
+        index.save(path)
+    _indexes[key] = index
+    _checked[key] = checked
+    return index
+
+
+def _extend_appended(
+    index: FingerprintIndex, queryset: QuerySet, state: str, n_jobs: int | None
+) -> FingerprintIndex | None:
+    """Extend the index by appended compounds, `None` if compounds changed otherwise."""
+    previous = json.loads(index.state) if index.state else {}
+    max_id = previous.get("max_id") or 0
+    if previous.get("updated_at") is not None:
+        updated = queryset.filter(id__lte=max_id, updated_at__gt=previous["updated_at"])
+        if updated.exists():
+            return None
+    if "checksum" in previous:
+        checksum = queryset.filter(id__lte=max_id).aggregate(
+            checksum=_smiles_checksum()
+        )["checksum"]
+        if checksum != previous["checksum"]:
+            return None
+    else:
+        # index from before checksums were tracked
+        return None
+    appended = FingerprintIndex.build(
+        queryset.filter(id__gt=max_id), index.kind, n_jobs=n_jobs
+    )
+    if len(index.ids) + len(appended.ids) != json.loads(state)["n"]:
+        # compounds were deleted
+        return None
+    index.extend(appended.ids, appended.fingerprints)
+    index.state = state
+    return index
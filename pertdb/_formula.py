@@ -0,0 +1,40 @@
+"""Parsing of molecular formulas into element counts."""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+
+_ELEMENT_COUNT = re.compile(r"([A-Z][a-z]?)(\d*)")
+
+METALS = frozenset(
+    # alkali & alkaline earth metals
+    "Li Na K Rb Cs Fr Be Mg Ca Sr Ba Ra "
+    # transition metals
+    "Sc Ti V Cr Mn Fe Co Ni Cu Zn Y Zr Nb Mo Tc Ru Rh Pd Ag Cd "
+    "Hf Ta W Re Os Ir Pt Au Hg Rf Db Sg Bh Hs Mt Ds Rg Cn "
+    # post-transition metals
+    "Al Ga In Sn Tl Pb Bi Po Nh Fl Mc Lv "
+    # lanthanides & actinides
+    "La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb Lu "
+    "Ac Th Pa U Np Pu Am Cm Bk Cf Es Fm Md No Lr".split()
+)
+"""Symbols of metallic elements, e.g., to exclude them in :meth:`~pertdb.Compound.filter_by_formula`."""
+
+
+def parse_formula(formula: str) -> dict[str, int]:
+    """Count the atoms per element in a molecular formula as computed by RDKit.
+
+    Charges like the trailing `-` in `C2H3O2-` are ignored.
+
+    Args:
+        formula: A molecular formula, e.g., `"C8H10N4O2"`.
+
+    Returns:
+        A dictionary mapping element symbols to counts, e.g.,
+        `{"C": 8, "H": 10, "N": 4, "O": 2}`.
+    """
+    counts: Counter[str] = Counter()
+    for element, count in _ELEMENT_COUNT.findall(formula):
+        counts[element] += int(count) if count else 1
+    return dict(counts)
@@ -0,0 +1,18 @@
+"""Fixed-width hashes of long text fields.
+
+Equality lookups on long strings like SMILES or sequences use indexes on 64-bit
+hashes rather than on the strings themselves; the strings are compared only for
+the few rows that share a hash.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+
+def hash64(value: str | None) -> int | None:
+    """Signed 64-bit digest of a string that fits a `BigIntegerField`, `None` for `None`."""
+    if value is None:
+        return None
+    digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
@@ -0,0 +1,364 @@
+"""Off-target scoring of CRISPR-Cas9 guides against a local reference genome.
+
+The genome is read from an uncompressed FASTA file with a samtools `.fai` index.
+The file is memory-mapped, so worker processes scoring different chromosomes share
+the page cache.
+
+Candidate sites are protospacers next to an `NGG` PAM on either strand. Sites are
+matched to guides by the pigeonhole principle: a site with at most `m`
+mismatches to a 20-mer guide has an identical seed among the `m + 1`
+non-overlapping seeds of the guide. Seeds are looked up in sorted arrays of guide
+seeds, and candidate pairs are verified and scored in vectorized form.
+
+Sites are scored with the position-specific mismatch penalties of Hsu et al. (2013).
+The guide's off-target score aggregates the scores of all sites except its
+on-target site.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from ._bits import bitcount_words
+from ._sequences import _CODES
+
+GUIDE_LENGTH = 20
+
+# probabilities that a mismatch at a position abolishes cutting, from the
+# PAM-distal end of the protospacer, Hsu et al. (2013)
+MISMATCH_WEIGHTS = np.array(
+    [
+        0.0,
+        0.0,
+        0.014,
+        0.0,
+        0.0,
+        0.395,
+        0.317,
+        0.0,
+        0.389,
+        0.079,
+        0.445,
+        0.508,
+        0.613,
+        0.851,
+        0.732,
+        0.828,
+        0.615,
+        0.804,
+        0.685,
+        0.583,
+    ]
+)
+
+# code of ambiguous guide bases, which don't match any base of the genome
+_GUIDE_AMBIGUOUS = 5
+_G = 2
+_C = 1
+# lower bits of the 2-bit bases of a 20-mer
+_LOWER_BITS = int("01" * GUIDE_LENGTH, 2)
+
+
+def read_fai(fasta: str | Path) -> list[tuple[str, int, int, int, int]]:
+    """Read the `.fai` index of a FASTA file.
+
+    Returns:
+        Tuples of sequence name, length, byte offset, bases per line and bytes per
+        line.
+    """
+    fai = Path(f"{fasta}.fai")
+    if not fai.exists():
+        raise FileNotFoundError(
+            f"{fai} doesn't exist, index the FASTA file with `samtools faidx {fasta}`"
+        )
+    entries = []
+    for line in fai.read_text().splitlines():
+        if line:
+            name, length, offset, line_bases, line_width = line.split("\t")[:5]
+            entries.append(
+                (name, int(length), int(offset), int(line_bases), int(line_width))
+            )
+    return entries
+
+
+def read_codes(
+    genome: np.ndarray, entry: tuple[str, int, int, int, int], start: int, stop: int
+) -> np.ndarray:
+    """2-bit codes of the bases `start:stop` of a sequence in a memory-mapped FASTA."""
+    _, _, offset, line_bases, line_width = entry
+
+    def position(base: int) -> int:
+        return offset + base // line_bases * line_width + base % line_bases
+
+    raw = genome[position(start) : position(stop)]
+    raw = raw[(raw != ord("\n")) & (raw != ord("\r"))]
+    return _CODES[raw]
+
+
+def reverse_complement_codes(codes: np.ndarray) -> np.ndarray:
+    """2-bit codes of the reverse complement, ambiguous bases stay ambiguous."""
+    return np.where(codes < 4, 3 - codes, codes)[::-1]
+
+
+def kmer_codes(codes: np.ndarray, k: int) -> np.ndarray:
+    """Codes of the k-mers starting at each position, -1 for k-mers with ambiguous bases."""
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+    kmers = np.zeros(n, dtype=np.int64)
+    for j in range(k):
+        kmers = (kmers << 2) | (codes[j : j + n] & 3)
+    n_ambiguous = np.concatenate([[0], np.cumsum(codes >= 4)])
+    kmers[n_ambiguous[k : k + n] > n_ambiguous[:n]] = -1
+    return kmers
+
+
+def encode_guides(sequences: list[str]) -> np.ndarray:
+    """2-bit codes of 20-mer guides, one row per guide."""
+    raw = np.frombuffer("".join(sequences).encode("ascii", "replace"), np.uint8)
+    codes = _CODES[raw].reshape(len(sequences), GUIDE_LENGTH)
+    return np.where(codes < 4, codes, _GUIDE_AMBIGUOUS).astype(np.uint8)
+
+
+def site_scores(mismatches: np.ndarray) -> np.ndarray:
+    """Scores of sites given boolean matrices of their mismatches to guides.
+
+    Combines the penalties of mismatched positions with penalties for the number and
+    the mean distance of mismatches like the MIT specificity score, a perfect match
+    scores 1.
+    """
+    n_mismatches = mismatches.sum(axis=1)
+    score = np.where(mismatches, 1 - MISMATCH_WEIGHTS, 1.0).prod(axis=1)
+    first = mismatches.argmax(axis=1)
+    last = GUIDE_LENGTH - 1 - mismatches[:, ::-1].argmax(axis=1)
+    mean_distance = np.where(
+        n_mismatches > 1,
+        (last - first) / np.maximum(n_mismatches - 1, 1),
+        GUIDE_LENGTH - 1,
+    )
+    score /= (GUIDE_LENGTH - 1 - mean_distance) / (GUIDE_LENGTH - 1) * 4 + 1
+    score /= np.maximum(n_mismatches, 1) ** 2
+    return score
+
+
+class _GuideSeeds:
+    """Seeds of guides, sorted per seed offset for lookups by binary search."""
+
+    def __init__(self, guide_codes: np.ndarray, max_mismatches: int):
+        self.codes = guide_codes
+        self.seed_size = GUIDE_LENGTH // (max_mismatches + 1)
+        self.offsets = [j * self.seed_size for j in range(max_mismatches + 1)]
+        self.kmers = np.zeros((len(guide_codes), len(self.offsets)), dtype=np.int64)
+        for j, offset in enumerate(self.offsets):
+            seed = guide_codes[:, offset : offset + self.seed_size]
+            for b in range(self.seed_size):
+                self.kmers[:, j] = (self.kmers[:, j] << 2) | (seed[:, b] & 3)
+            # seeds with ambiguous bases match no site, also no ambiguous site (-1)
+            self.kmers[(seed >= 4).any(axis=1), j] = -2
+        self.order = [
+            np.argsort(self.kmers[:, j], kind="stable")
+            for j in range(len(self.offsets))
+        ]
+        self.sorted = [self.kmers[order, j] for j, order in enumerate(self.order)]
+        # whole guides packed into 40 bits, -2 for guides with ambiguous bases
+        self.words = np.zeros(len(guide_codes), dtype=np.int64)
+        for b in range(GUIDE_LENGTH):
+            self.words = (self.words << 2) | (guide_codes[:, b] & 3)
+        self.words[(guide_codes >= 4).any(axis=1)] = -2
+
+
+def _count_mismatches(site_words: np.ndarray, guide_words: np.ndarray) -> np.ndarray:
+    """Number of mismatches between 20-mers packed into 40 bits."""
+    diff = site_words ^ guide_words
+    # collapse each 2-bit difference into the lower bit of the base
+    diff = (diff | (diff >> 1)) & _LOWER_BITS
+    return bitcount_words(diff)
+
+
+def _score_sites(
+    codes: np.ndarray,
+    sites: np.ndarray,
+    guides: _GuideSeeds,
+    max_mismatches: int,
+    scores: np.ndarray,
+    n_perfect: np.ndarray,
+    max_pairs: int,
+) -> None:
+    """Add the scores of protospacers starting at `sites` of a strand to `scores`."""
+    kmers = kmer_codes(codes, guides.seed_size)
+    site_kmers = np.stack([kmers[sites + offset] for offset in guides.offsets], axis=1)
+    site_words = kmer_codes(codes, GUIDE_LENGTH)[sites]
+    positions = np.arange(GUIDE_LENGTH)
+    for j in range(len(guides.offsets)):
+        left = np.searchsorted(guides.sorted[j], site_kmers[:, j], side="left")
+        right = np.searchsorted(guides.sorted[j], site_kmers[:, j], side="right")
+        counts = right - left
+        cumulative = np.cumsum(counts)
+        start = 0
+        # bound the memory of candidate pairs
+        while start < len(sites):
+            before = cumulative[start - 1] if start > 0 else 0
+            stop = max(
+                int(np.searchsorted(cumulative, before + max_pairs, side="right")),
+                start + 1,
+            )
+            chunk_counts = counts[start:stop]
+            site_idx = start + np.repeat(np.arange(len(chunk_counts)), chunk_counts)
+            shift = np.repeat(
+                left[start:stop] - np.cumsum(chunk_counts) + chunk_counts,
+                chunk_counts,
+            )
+            guide_idx = guides.order[j][np.arange(int(chunk_counts.sum())) + shift]
+            start = stop
+            # each pair is verified for the first seed it shares
+            first = np.ones(len(site_idx), dtype=bool)
+            for earlier in range(j):
+                first &= (
+                    site_kmers[site_idx, earlier] != guides.kmers[guide_idx, earlier]
+                )
+            site_idx, guide_idx = site_idx[first], guide_idx[first]
+            n_mismatches = _count_mismatches(
+                site_words[site_idx], guides.words[guide_idx]
+            )
+            # compare base by base if a site or guide has ambiguous bases
+            ambiguous = (site_words[site_idx] < 0) | (guides.words[guide_idx] < 0)
+            if ambiguous.any():
+                n_mismatches[ambiguous] = (
+                    codes[sites[site_idx[ambiguous]][:, None] + positions]
+                    != guides.codes[guide_idx[ambiguous]]
+                ).sum(axis=1)
+            hits = n_mismatches <= max_mismatches
+            if not hits.any():
+                continue
+            site_idx, guide_idx = site_idx[hits], guide_idx[hits]
+            mismatches = (
+                codes[sites[site_idx][:, None] + positions] != guides.codes[guide_idx]
+            )
+            scores += np.bincount(
+                guide_idx, weights=site_scores(mismatches), minlength=len(scores)
+            )
+            perfect = ~mismatches.any(axis=1)
+            n_perfect += np.bincount(guide_idx[perfect], minlength=len(n_perfect))
+
+
+def score_chromosome(
+    fasta: str | Path,
+    entry: tuple[str, int, int, int, int],
+    guide_codes: np.ndarray,
+    max_mismatches: int,
+    block_size: int = 1_000_000,
+    max_pairs: int = 1_000_000,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Scores of the sites of guides on both strands of one sequence of a FASTA file.
+
+    The sequence is processed in blocks of `block_size` bases to bound memory.
+
+    Returns:
+        The summed site scores and the number of perfectly matching sites per guide.
+    """
+    genome = np.memmap(fasta, dtype=np.uint8, mode="r")
+    guides = _GuideSeeds(guide_codes, max_mismatches)
+    scores = np.zeros(len(guide_codes))
+    n_perfect = np.zeros(len(guide_codes), dtype=np.int64)
+    length = entry[1]
+    # protospacer & PAM
+    site_length = GUIDE_LENGTH + 3
+    for block_start in range(0, length, block_size):
+        codes = read_codes(
+            genome,
+            entry,
+            block_start,
+            min(length, block_start + block_size + site_length - 1),
+        )
+        # sites are assigned to the block of their leftmost base
+        n_sites = min(block_size, len(codes) - site_length + 1)
+        if n_sites <= 0:
+            continue
+        starts = np.arange(n_sites)
+        # forward strand: protospacer followed by NGG
+        forward = starts[
+            (codes[starts + GUIDE_LENGTH + 1] == _G)
+            & (codes[starts + GUIDE_LENGTH + 2] == _G)
+        ]
+        _score_sites(
+            codes,
+            forward,
+            guides,
+            max_mismatches,
+            scores,
+            n_perfect,
+            max_pairs,
+        )
+        # reverse strand: CCN followed by the reverse complement of the protospacer
+        reverse = starts[(codes[starts] == _C) & (codes[starts + 1] == _C)]
+        reverse_codes = reverse_complement_codes(codes)
+        _score_sites(
+            reverse_codes,
+            len(codes) - reverse - site_length,
+            guides,
+            max_mismatches,
+            scores,
+            n_perfect,
+            max_pairs,
+        )
+    return scores, n_perfect
+
+
+def score_guides(
+    fasta: str | Path,
+    sequences: list[str],
+    max_mismatches: int = 3,
+    n_jobs: int | None = None,
+    block_size: int = 1_000_000,
+) -> np.ndarray:
+    """Off-target scores of 20-mer guides against a reference genome.
+
+    Scores the sequences of a FASTA file in a process pool.
+    The scores of all sites of a guide with at most `max_mismatches` mismatches
+    except one perfect match, the on-target site, are summed to `s`, and the
+    off-target score is `100 * s / (1 + s)`.
+    It's 0 for guides without off-target sites and grows with the number and
+    similarity of off-target sites, like `100 - ` the MIT specificity score.
+
+    Returns:
+        Off-target scores between 0 and 100, one per guide.
+    """
+    if not 0 <= max_mismatches < GUIDE_LENGTH // 2:
+        raise ValueError(
+            f"max_mismatches must be between 0 and {GUIDE_LENGTH // 2 - 1}"
+        )
+    if any(len(sequence) != GUIDE_LENGTH for sequence in sequences):
+        raise ValueError(f"guides must have {GUIDE_LENGTH} bases")
+    entries = sorted(read_fai(fasta), key=lambda entry: -entry[1])
+    guide_codes = encode_guides(sequences)
+    scores = np.zeros(len(sequences))
+    n_perfect = np.zeros(len(sequences), dtype=np.int64)
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    args = (
+        [fasta] * len(entries),
+        entries,
+        [guide_codes] * len(entries),
+        [max_mismatches] * len(entries),
+        [block_size] * len(entries),
+    )
+    if n_jobs <= 1 or len(entries) <= 1:
+        results = map(score_chromosome, *args)
+        for chromosome_scores, chromosome_n_perfect in results:
+            scores += chromosome_scores
+            n_perfect += chromosome_n_perfect
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(entries))) as executor:
+            for chromosome_scores, chromosome_n_perfect in executor.map(
+                score_chromosome, *args
+            ):
+                scores += chromosome_scores
+                n_perfect += chromosome_n_perfect
+    # the on-target site scores 1
+    scores -= np.minimum(n_perfect, 1)
+    scores = np.maximum(scores, 0)
+    return 100 * scores / (1 + scores)
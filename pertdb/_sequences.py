@@ -0,0 +1,162 @@
+"""Seeds and 2-bit encodings of nucleotide sequences for mismatch searches.
+
+A sequence of length `L` is cut into non-overlapping seeds of :data:`SEED_SIZE`
+bases at fixed offsets. By the pigeonhole principle, two sequences of equal length
+with at most `m` mismatches share at least one identical seed among any `m + 1`
+seeds, so candidates can be looked up by exact seed matches and are then verified
+by their Hamming distance.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from ._bits import bitcount
+
+SEED_SIZE = 5
+"""Number of bases per seed, 20-mer guides have 4 seeds."""
+
+# maps ASCII codes to 2-bit base codes, 4 for ambiguous bases like N
+_CODES = np.full(256, 4, dtype=np.uint8)
+for _code, _bases in enumerate(["Aa", "Cc", "Gg", "TtUu"]):
+    for _base in _bases:
+        _CODES[ord(_base)] = _code
+
+_DIGITS = str.maketrans("ACGTU", "01233")
+
+# complements of IUPAC nucleotide codes
+_COMPLEMENT = str.maketrans("ACGTRYKMSWBDHVN", "TGCAYRMKSWVHDBN")
+
+
+def normalize_sequence(sequence: str) -> str:
+    """Uppercase DNA version of a sequence, RNA bases `U` become `T`."""
+    return sequence.upper().replace("U", "T")
+
+
+def reverse_complement(sequence: str) -> str:
+    """Reverse complement of a normalized DNA sequence."""
+    return sequence.translate(_COMPLEMENT)[::-1]
+
+
+def canonical_sequence(sequence: str) -> str:
+    """Strand-independent form of a sequence.
+
+    The lexicographically smaller of the normalized sequence and its reverse
+    complement, so that both strands of a protospacer have the same canonical form.
+    """
+    sequence = normalize_sequence(sequence)
+    return min(sequence, reverse_complement(sequence))
+
+
+def sequence_seeds(sequence: str) -> list[tuple[int, int]]:
+    """Offsets and 2-bit codes of the seeds of a sequence.
+
+    Seeds with ambiguous bases are skipped, such bases are mismatches of any base.
+    """
+    sequence = normalize_sequence(sequence)
+    seeds = []
+    for offset in range(0, len(sequence) - SEED_SIZE + 1, SEED_SIZE):
+        kmer = sequence[offset : offset + SEED_SIZE]
+        if kmer.strip("ACGT") == "":
+            seeds.append((offset, int(kmer.translate(_DIGITS), 4)))
+    return seeds
+
+
+def encode_2bit(sequences: list[str], length: int) -> tuple[np.ndarray, np.ndarray]:
+    """Pack sequences of equal length into 2 bits per base.
+
+    Args:
+        sequences: Sequences of `length` bases.
+        length: Length of the sequences.
+
+    Returns:
+        Packed bases of shape `(len(sequences), ceil(length / 4))` and a mask of the
+        same shape that has the lower bit of a base set for ambiguous bases.
+    """
+    raw = np.frombuffer("".join(sequences).encode("ascii", "replace"), np.uint8)
+    codes = _CODES[raw].reshape(len(sequences), length)
+    ambiguous = (codes == 4).view(np.uint8)
+    codes = np.where(ambiguous, 0, codes).astype(np.uint8)
+    n_bytes = -(-length // 4)
+    padding = ((0, 0), (0, 4 * n_bytes - length))
+    codes, ambiguous = np.pad(codes, padding), np.pad(ambiguous, padding)
+    packed = np.zeros((len(sequences), n_bytes), dtype=np.uint8)
+    mask = np.zeros((len(sequences), n_bytes), dtype=np.uint8)
+    for i, shift in enumerate((6, 4, 2, 0)):
+        packed |= codes[:, i::4] << shift
+        mask |= ambiguous[:, i::4] << shift
+    return packed, mask
+
+
+def hamming(
+    packed: np.ndarray, mask: np.ndarray, query: np.ndarray, query_mask: np.ndarray
+) -> np.ndarray:
+    """Number of mismatches of each packed sequence to a packed query sequence.
+
+    Ambiguous bases in either sequence count as mismatches.
+    """
+    diff = packed ^ query
+    # collapse each 2-bit difference into the lower bit of the base
+    diff = ((diff | (diff >> 1)) & 0x55) | mask | query_mask
+    return bitcount(diff).sum(axis=-1, dtype=np.int32)
+
+
+# length of packed sequences, prepended to their bases and mask
+_LENGTH_BYTES = 4
+
+_BASES = np.frombuffer(b"ACGTN", dtype=np.uint8)
+
+
+def pack_sequence(sequence: str) -> bytes:
+    """Pack a sequence into its length, its 2-bit bases and the mask of ambiguous bases.
+
+    Lowercase and RNA bases are packed like uppercase DNA bases, ambiguous bases
+    are unpacked as `N`.
+    """
+    packed, mask = encode_2bit([sequence], len(sequence))
+    return (
+        len(sequence).to_bytes(_LENGTH_BYTES, "little")
+        + packed.tobytes()
+        + mask.tobytes()
+    )
+
+
+def packed_length(blob: bytes) -> int:
+    """Number of bases of a packed sequence."""
+    return int.from_bytes(blob[:_LENGTH_BYTES], "little")
+
+
+def stack_packed(blobs: list[bytes], length: int) -> tuple[np.ndarray, np.ndarray]:
+    """View packed sequences of equal length as matrices of bases and masks.
+
+    Both matrices are views into a single buffer that holds the packed sequences.
+
+    Returns:
+        Packed bases and mask of shape `(len(blobs), ceil(length / 4))` as returned
+        by :func:`encode_2bit`.
+    """
+    n_bytes = -(-length // 4)
+    buffer = np.frombuffer(b"".join(blobs), dtype=np.uint8)
+    matrix = buffer.reshape(len(blobs), _LENGTH_BYTES + 2 * n_bytes)
+    return (
+        matrix[:, _LENGTH_BYTES : _LENGTH_BYTES + n_bytes],
+        matrix[:, _LENGTH_BYTES + n_bytes :],
+    )
+
+
+def decode_2bit(packed: np.ndarray, mask: np.ndarray, length: int) -> list[str]:
+    """Decode packed sequences of equal length, the inverse of :func:`encode_2bit`."""
+    codes = np.empty((len(packed), 4 * packed.shape[1]), dtype=np.uint8)
+    ambiguous = np.empty_like(codes)
+    for i, shift in enumerate((6, 4, 2, 0)):
+        codes[:, i::4] = (packed >> shift) & 3
+        ambiguous[:, i::4] = (mask >> shift) & 1
+    codes = np.where(ambiguous, 4, codes)[:, :length]
+    return [row.tobytes().decode("ascii") for row in _BASES[codes]]
+
+
+def unpack_sequence(blob: bytes) -> str:
+    """Decode a sequence packed by :func:`pack_sequence`."""
+    length = packed_length(blob)
+    packed, mask = stack_packed([blob], length)
+    return decode_2bit(packed, mask, length)[0]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+class Settings:
+    """Settings for `pertdb`.
+
+    Use `pertdb.settings` to access them.
+
+    Example::
+
+        import pertdb
+
+        # bound the cost of tautomer canonicalization for macrocycles & peptides
+        pertdb.settings.max_tautomers = 200
+        pertdb.settings.max_transforms = 200
+    """
+
+    def __init__(self):
+        self.max_tautomers: int = 1000
+        """Maximum number of tautomers enumerated during SMILES standardization."""
+        self.max_transforms: int = 1000
+        """Maximum number of transforms applied during tautomer enumeration."""
+        self.tautomer_remove_bond_stereo: bool = True
+        """Remove stereochemistry from double bonds involved in tautomerism."""
+        self.tautomer_remove_sp3_stereo: bool = True
+        """Remove stereochemistry from sp3 centers involved in tautomerism."""
+        self.tautomer_reassign_stereo: bool = True
+        """Reassign stereochemistry after tautomer enumeration."""
+        self.standardization_timeout: float | None = None
+        """Seconds after which the batch standardization of a single SMILES is aborted.
+
+        Aborted SMILES are treated like invalid SMILES, see
+        :meth:`~pertdb.Compound.standardize_smiles_batch`, but compounds aren't
+        marked with the current versions, so that
+        :meth:`~pertdb.Compound.restandardize` retries them.
+        """
+        self.cache_standardization: bool = False
+        """Cache standardized SMILES in a local SQLite file in the lamin cache directory.
+
+        Speeds up registering the same compound libraries repeatedly, also across instances.
+        """
+        self.cache_max_entries: int = 1_000_000
+        """Maximum number of cached SMILES, the least recently used are evicted."""
+        self.defer_standardization: bool = False
+        """Only store the raw SMILES when creating a :class:`~pertdb.Compound`.
+
+        The compound is marked as pending and standardized later by
+        :meth:`~pertdb.Compound.standardize_pending`.
+        """
+        self.fingerprint_index_ttl: float = 60.0
+        """Seconds for which a cached fingerprint index is searched without checking the registry.
+
+        Checking for changes aggregates over all compounds. Compounds written by the
+        current process trigger a check on the next search, changes by other clients
+        are seen after at most this time. Set to `0` to check on every search.
+        """
+        self.pack_sequences: bool = False
+        """Store the sequence of a :class:`~pertdb.GeneticPerturbation` also 2-bit packed.
+
+        Speeds up :meth:`~pertdb.GeneticPerturbation.export_packed_sequences`.
+        """
+
+    def _standardizer_config(self) -> dict[str, Any]:
+        return {
+            "max_tautomers": self.max_tautomers,
+            "max_transforms": self.max_transforms,
+            "tautomer_remove_bond_stereo": self.tautomer_remove_bond_stereo,
+            "tautomer_remove_sp3_stereo": self.tautomer_remove_sp3_stereo,
+            "tautomer_reassign_stereo": self.tautomer_reassign_stereo,
+        }
+
+    def __repr__(self) -> str:
+        settings = "\n".join(f"  {k}: {v}" for k, v in vars(self).items())
+        return f"Settings\n{settings}"
+
+
+settings = Settings()
@@ -0,0 +1,527 @@
+"""SMILES standardization for :class:`~pertdb.Compound`.
+
+This module doesn't import Django so that it can run in worker processes.
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib.util
+import multiprocessing
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.connection import wait
+from typing import TYPE_CHECKING, Any
+
+from lamin_utils import logger
+
+from ._cache import get_cache
+from ._settings import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from multiprocessing.connection import Connection
+
+    from rdkit import Chem
+
+# RDKit is imported on first use as it dominates the import time of pertdb
+RDKIT_AVAILABLE = importlib.util.find_spec("rdkit") is not None
+
+
+@functools.cache
+def _import_rdkit() -> None:
+    from rdkit import rdBase
+
+    rdBase.DisableLog("rdApp.info")
+    rdBase.DisableLog("rdApp.warning")
+
+
+# bump when a change of the pipeline changes its outputs
+STANDARDIZER_VERSION = "1"
+
+# maps Compound field names to functions computing them from the standardized molecule
+DESCRIPTORS: dict[str, Callable[[Chem.Mol], Any]] = {}
+
+
+def register_descriptor(field: str) -> Callable:
+    """Register a function that computes a :class:`~pertdb.Compound` field.
+
+    The function receives the standardized molecule so that all derived fields
+    are computed from a single parse of the input SMILES.
+
+    Args:
+        field: Name of the :class:`~pertdb.Compound` field.
+    """
+
+    def decorator(func: Callable[[Chem.Mol], Any]) -> Callable[[Chem.Mol], Any]:
+        DESCRIPTORS[field] = func
+        return func
+
+    return decorator
+
+
+@register_descriptor("inchikey")
+def _inchikey(mol: Chem.Mol) -> str:
+    from rdkit import Chem
+
+    return Chem.MolToInchiKey(mol)
+
+
+@register_descriptor("molweight")
+def _molweight(mol: Chem.Mol) -> float:
+    from rdkit.Chem import Descriptors
+
+    return Descriptors.MolWt(mol)
+
+
+@register_descriptor("molformula")
+def _molformula(mol: Chem.Mol) -> str:
+    from rdkit.Chem.rdMolDescriptors import CalcMolFormula
+
+    return CalcMolFormula(mol)
+
+
+@register_descriptor("logp")
+def _logp(mol: Chem.Mol) -> float:
+    from rdkit.Chem.Crippen import MolLogP
+
+    return MolLogP(mol)
+
+
+@register_descriptor("tpsa")
+def _tpsa(mol: Chem.Mol) -> float:
+    from rdkit.Chem.rdMolDescriptors import CalcTPSA
+
+    return CalcTPSA(mol)
+
+
+@register_descriptor("hbd")
+def _hbd(mol: Chem.Mol) -> int:
+    from rdkit.Chem.rdMolDescriptors import CalcNumLipinskiHBD
+
+    # counted as in Lipinski's rule of five, N-H and O-H bonds
+    return CalcNumLipinskiHBD(mol)
+
+
+@register_descriptor("hba")
+def _hba(mol: Chem.Mol) -> int:
+    from rdkit.Chem.rdMolDescriptors import CalcNumLipinskiHBA
+
+    # counted as in Lipinski's rule of five, N and O atoms
+    return CalcNumLipinskiHBA(mol)
+
+
+@register_descriptor("rotatable_bonds")
+def _rotatable_bonds(mol: Chem.Mol) -> int:
+    from rdkit.Chem.rdMolDescriptors import CalcNumRotatableBonds
+
+    return CalcNumRotatableBonds(mol)
+
+
+@register_descriptor("heavy_atoms")
+def _heavy_atoms(mol: Chem.Mol) -> int:
+    return mol.GetNumHeavyAtoms()
+
+
+@register_descriptor("murcko_scaffold")
+def _murcko_scaffold(mol: Chem.Mol) -> str:
+    from rdkit import Chem
+    from rdkit.Chem.Scaffolds.MurckoScaffold import GetScaffoldForMol
+
+    # empty for acyclic molecules
+    return Chem.MolToSmiles(GetScaffoldForMol(mol))
+
+
+@register_descriptor("generic_scaffold")
+def _generic_scaffold(mol: Chem.Mol) -> str:
+    from rdkit import Chem
+    from rdkit.Chem.Scaffolds.MurckoScaffold import (
+        GetScaffoldForMol,
+        MakeScaffoldGeneric,
+    )
+
+    # all atoms carbon & all bonds single
+    return Chem.MolToSmiles(MakeScaffoldGeneric(GetScaffoldForMol(mol)))
+
+
+def field_names() -> list[str]:
+    """Names of all :class:`~pertdb.Compound` fields set by :func:`compute_fields`."""
+    return ["canonical_smiles", *DESCRIPTORS]
+
+
+class Standardizer:
+    """Holds the RDKit standardization objects for one configuration.
+
+    Building the uncharger and the tautomer enumerator parses their transform
+    tables, hence, instances are cached per thread, see :func:`get_standardizer`.
+
+    Args:
+        config: The standardizer configuration, see `pertdb.settings`.
+    """
+
+    def __init__(self, config: dict[str, Any]):
+        _import_rdkit()
+        from rdkit.Chem.MolStandardize import rdMolStandardize
+
+        self.config = config
+        params = rdMolStandardize.CleanupParameters()
+        params.maxTautomers = config["max_tautomers"]
+        params.maxTransforms = config["max_transforms"]
+        params.tautomerRemoveBondStereo = config["tautomer_remove_bond_stereo"]
+        params.tautomerRemoveSp3Stereo = config["tautomer_remove_sp3_stereo"]
+        params.tautomerReassignStereo = config["tautomer_reassign_stereo"]
+        self.params = params
+        self.uncharger = rdMolStandardize.Uncharger()
+        self.tautomer_enumerator = rdMolStandardize.TautomerEnumerator(params)
+
+    def standardize(self, smiles: str) -> Chem.Mol:
+        """Parse and standardize a SMILES string, see :meth:`~pertdb.Compound.standardize_smiles`."""
+        from rdkit import Chem
+        from rdkit.Chem.MolStandardize import rdMolStandardize
+
+        # Step 1: Parse SMILES
+        mol = Chem.MolFromSmiles(smiles)
+        if mol is None:
+            raise ValueError(f"Could not parse SMILES: {smiles}")
+
+        # Step 2: General cleanup
+        # removeHs, disconnect metal atoms, normalize the molecule, reionize the molecule
+        clean_mol = rdMolStandardize.Cleanup(mol, self.params)
+
+        # Step 3: Get the parent fragment
+        parent_mol = rdMolStandardize.FragmentParent(clean_mol, self.params)
+
+        # Step 4: Neutralize
+        uncharged_mol = self.uncharger.uncharge(parent_mol)
+
+        # Step 5: Generate canonical tautomer
+        return self.tautomer_enumerator.Canonicalize(uncharged_mol)
+
+
+_local = threading.local()
+
+
+def get_standardizer() -> Standardizer:
+    """The standardizer of the current thread for the current `pertdb.settings`."""
+    config = settings._standardizer_config()
+    standardizer = getattr(_local, "standardizer", None)
+    if standardizer is None or standardizer.config != config:
+        standardizer = Standardizer(config)
+        _local.standardizer = standardizer
+    return standardizer
+
+
+def version_fields() -> dict[str, str]:
+    """Fields recording the pipeline and RDKit versions that standardize a compound."""
+    from rdkit import rdBase
+
+    return {
+        "standardizer_version": STANDARDIZER_VERSION,
+        "rdkit_version": rdBase.rdkitVersion,
+    }
+
+
+def standardize_mol(smiles: str) -> Chem.Mol:
+    """Parse and standardize a SMILES string with the standardizer of the current thread."""
+    return get_standardizer().standardize(smiles)
+
+
+def standardize_smiles(smiles: str) -> str:
+    """Standardize a SMILES string, see :meth:`~pertdb.Compound.standardize_smiles`."""
+    from rdkit import Chem
+
+    # Step 6: Convert back to canonical SMILES string for output
+    return Chem.MolToSmiles(standardize_mol(smiles), canonical=True)
+
+
+def compute_fields(smiles: str) -> dict[str, Any]:
+    """Compute the standardized fields of a compound from a raw SMILES string.
+
+    The standardized molecule is passed to all registered descriptors,
+    see :func:`register_descriptor`.
+
+    Args:
+        smiles: Raw SMILES string.
+
+    Returns:
+        A dictionary with `canonical_smiles` and all registered descriptors,
+        e.g., `inchikey`, `molweight` and `molformula`.
+
+    Raises:
+        ValueError: If the SMILES string can't be parsed or standardized.
+    """
+    from rdkit import Chem
+
+    mol = standardize_mol(smiles)
+    fields = {"canonical_smiles": Chem.MolToSmiles(mol, canonical=True)}
+    for field, descriptor in DESCRIPTORS.items():
+        fields[field] = descriptor(mol)
+    return fields
+
+
+def compute_fields_cached(smiles: str) -> dict[str, Any]:
+    """Like :func:`compute_fields` but reads from & writes to the standardization cache."""
+    cache = get_cache(field_names())
+    if cache is None:
+        return compute_fields(smiles)
+    hits = cache.get_many([smiles])
+    if smiles in hits:
+        return hits[smiles]
+    fields = compute_fields(smiles)
+    cache.set_many({smiles: fields})
+    return fields
+
+
+def compute_descriptors(
+    canonical_smiles: list[str], fields: list[str]
+) -> list[dict[str, Any] | None]:
+    """Compute descriptors from canonical SMILES without standardizing them again.
+
+    Args:
+        canonical_smiles: Canonical SMILES as computed by :func:`compute_fields`.
+        fields: Names of registered descriptors.
+
+    Returns:
+        Descriptor values in input order, `None` for SMILES that can't be parsed.
+    """
+    _import_rdkit()
+    from rdkit import Chem
+
+    results: list[dict[str, Any] | None] = []
+    for smiles in canonical_smiles:
+        mol = Chem.MolFromSmiles(smiles)
+        if mol is None:
+            results.append(None)
+        else:
+            results.append({field: DESCRIPTORS[field](mol) for field in fields})
+    return results
+
+
+def compute_descriptors_batch(
+    canonical_smiles: list[str],
+    fields: list[str],
+    n_jobs: int | None = None,
+    chunk_size: int = 5_000,
+) -> list[dict[str, Any] | None]:
+    """Like :func:`compute_descriptors` but computes chunks in a process pool."""
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    chunks = [
+        canonical_smiles[i : i + chunk_size]
+        for i in range(0, len(canonical_smiles), chunk_size)
+    ]
+    if n_jobs <= 1 or len(chunks) <= 1:
+        return compute_descriptors(canonical_smiles, fields)
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks))) as executor:
+        results = executor.map(compute_descriptors, chunks, [fields] * len(chunks))
+        return [result for chunk in results for result in chunk]
+
+
+def _init_worker(config: dict[str, Any]) -> None:
+    # worker processes don't inherit settings when they're spawned
+    for key, value in config.items():
+        setattr(settings, key, value)
+
+
+def _compute_fields_or_none(smiles: str | None) -> dict[str, Any] | None:
+    if not smiles:
+        return None
+    try:
+        return compute_fields(smiles)
+    except ValueError:
+        return None
+
+
+# reasons of failures that might not recur, unlike invalid SMILES
+TIMED_OUT = "timed out"
+CRASHED = "crashed a worker"
+TRANSIENT_FAILURES = frozenset({TIMED_OUT, CRASHED})
+
+
+def standardize_batch(
+    smiles: Iterable[str | None],
+    n_jobs: int | None = None,
+    timeout: float | None = None,
+) -> list[dict[str, Any] | None]:
+    """Compute the standardized fields for many SMILES strings in worker processes.
+
+    Each worker standardizes one SMILES at a time. If a SMILES exceeds the
+    per-molecule `timeout` or crashes its worker, the worker is replaced and the
+    SMILES is treated like an invalid SMILES. Failures are logged in aggregate.
+
+    Args:
+        smiles: Raw SMILES strings.
+        n_jobs: Number of worker processes, defaults to the number of CPUs.
+            Pass `1` to standardize in the current process unless there is a timeout.
+        timeout: Seconds per SMILES, defaults to `pertdb.settings.standardization_timeout`.
+
+    Returns:
+        The outputs of :func:`compute_fields` in input order, `None` for invalid SMILES.
+        Duplicate SMILES are standardized once, cached SMILES aren't standardized again.
+    """
+    return standardize_batch_with_failures(smiles, n_jobs=n_jobs, timeout=timeout)[0]
+
+
+def standardize_batch_with_failures(
+    smiles: Iterable[str | None],
+    n_jobs: int | None = None,
+    timeout: float | None = None,
+) -> tuple[list[dict[str, Any] | None], list[str | None]]:
+    """Like :func:`standardize_batch` but also returns why SMILES failed.
+
+    Returns:
+        The outputs of :func:`compute_fields` and the failure reasons in input order,
+        reasons in :data:`TRANSIENT_FAILURES` mark SMILES worth retrying.
+    """
+    if not RDKIT_AVAILABLE:
+        raise ImportError("RDKit is not available. Please install: pip install rdkit")
+    if timeout is None:
+        timeout = settings.standardization_timeout
+    smiles = list(smiles)
+    unique_smiles = list(dict.fromkeys(s for s in smiles if s))
+    cache = get_cache(field_names())
+    results = cache.get_many(unique_smiles) if cache is not None else {}
+    missing = [s for s in unique_smiles if s not in results]
+    computed, failures = _compute_many(missing, n_jobs, timeout)
+    if cache is not None:
+        # timeouts & crashes aren't deterministic, hence, only successes are cached
+        cache.set_many({s: f for s, f in computed.items() if f is not None})
+    results.update(computed)
+    if failures:
+        counts = Counter(failures.values())
+        summary = ", ".join(f"{n} {reason}" for reason, n in counts.items())
+        logger.warning(f"could not standardize {len(failures)} SMILES: {summary}")
+    return (
+        [results[s] if s else None for s in smiles],
+        [failures.get(s) if s else None for s in smiles],
+    )
+
+
+def _compute_many(
+    smiles: list[str], n_jobs: int | None, timeout: float | None
+) -> tuple[dict[str, dict[str, Any] | None], dict[str, str]]:
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, len(smiles)))
+    if (n_jobs == 1 and timeout is None) or not smiles:
+        results = {s: _compute_fields_or_none(s) for s in smiles}
+        failures = {s: "invalid" for s, r in results.items() if r is None}
+        return results, failures
+    return _WorkerPool(n_jobs, timeout).run(smiles)
+
+
+def _worker_loop(conn: Connection, config: dict[str, Any]) -> None:
+    _init_worker(config)
+    while True:
+        try:
+            smiles = conn.recv()
+        except EOFError:
+            break
+        if smiles is None:
+            break
+        conn.send(_compute_fields_or_none(smiles))
+
+
+class _Worker:
+    def __init__(self, context: Any, config: dict[str, Any]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_loop, args=(child_conn, config), daemon=True
+        )
+        self.process.start()
+        # so that the parent sees EOF when the worker dies
+        child_conn.close()
+        self.smiles: str | None = None
+        self.started = 0.0
+
+    def submit(self, smiles: str) -> None:
+        self.smiles = smiles
+        self.started = time.monotonic()
+        self.conn.send(smiles)
+
+    def stop(self, kill: bool = False) -> None:
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join()
+        self.conn.close()
+
+
+class _WorkerPool:
+    """Worker processes that standardize one SMILES at a time.
+
+    Unlike a :class:`~concurrent.futures.ProcessPoolExecutor`, the pool replaces
+    workers that exceed the timeout or crash without failing the whole batch.
+    """
+
+    def __init__(self, n_jobs: int, timeout: float | None):
+        self.n_jobs = n_jobs
+        self.timeout = timeout
+        self.context = multiprocessing.get_context()
+        self.config = settings._standardizer_config()
+
+    def run(
+        self, smiles: list[str]
+    ) -> tuple[dict[str, dict[str, Any] | None], dict[str, str]]:
+        results: dict[str, dict[str, Any] | None] = {}
+        failures: dict[str, str] = {}
+        queue = iter(smiles)
+        workers = [_Worker(self.context, self.config) for _ in range(self.n_jobs)]
+
+        def submit_next(i: int) -> None:
+            smiles = workers[i].smiles = next(queue, None)
+            if smiles is None:
+                return
+            try:
+                workers[i].submit(smiles)
+            except OSError:
+                # the worker died after returning its previous result
+                workers[i].stop(kill=True)
+                workers[i] = _Worker(self.context, self.config)
+                workers[i].submit(smiles)
+
+        def replace(i: int, reason: str) -> None:
+            results[workers[i].smiles] = None
+            failures[workers[i].smiles] = reason
+            workers[i].stop(kill=True)
+            workers[i] = _Worker(self.context, self.config)
+            submit_next(i)
+
+        try:
+            for i in range(self.n_jobs):
+                submit_next(i)
+            while busy := [i for i, w in enumerate(workers) if w.smiles is not None]:
+                wait_timeout = None
+                if self.timeout is not None:
+                    deadline = min(workers[i].started for i in busy) + self.timeout
+                    wait_timeout = max(0.0, deadline - time.monotonic())
+                ready = wait([workers[i].conn for i in busy], timeout=wait_timeout)
+                now = time.monotonic()
+                for i in busy:
+                    worker = workers[i]
+                    if worker.conn in ready:
+                        try:
+                            result = worker.conn.recv()
+                        except EOFError:
+                            replace(i, CRASHED)
+                            continue
+                        results[worker.smiles] = result
+                        if result is None:
+                            failures[worker.smiles] = "invalid"
+                        submit_next(i)
+                    elif (
+                        self.timeout is not None
+                        and now - worker.started >= self.timeout
+                    ):
+                        replace(i, TIMED_OUT)
+        finally:
+            for worker in workers:
+                worker.stop(kill=worker.smiles is not None)
+        return results, failures
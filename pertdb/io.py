@@ -0,0 +1,401 @@
+"""Streaming ingestion of compound files and guide libraries.
+
+Files are read in chunks of rows, so that memory stays bounded for files of any
+size. Each chunk of compounds is standardized and registered with
+:meth:`~pertdb.Compound.from_smiles_bulk`, each chunk of guides with
+:meth:`~pertdb.GeneticPerturbation.from_guides_bulk`.
+
+.. autosummary::
+   :toctree: .
+
+   load_compounds
+   load_chembl
+   load_guide_library
+   iter_chunks
+   iter_sdf
+   iter_csv
+   iter_parquet
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+
+    import pandas as pd
+
+# name of the SMILES column of chunks read from SDF files
+SDF_SMILES_COLUMN = "smiles"
+
+# gene labels of non-targeting guides in common libraries, compared case-insensitively
+CONTROL_LABELS = (
+    "Non-Targeting Control",
+    "non-targeting",
+    "NonTargeting",
+    "NTC",
+    "control",
+)
+
+
+def iter_sdf(path: str | Path, chunk_size: int = 10_000) -> Iterator[pd.DataFrame]:
+    """Read an SDF file, optionally gzipped, in chunks of molecules.
+
+    Chunks have a `_Name` column with the molecule titles, a `smiles` column and a
+    column per SD property. Molecules that RDKit can't parse have `None` SMILES.
+
+    Args:
+        path: Path of the SDF file.
+        chunk_size: Number of molecules per chunk.
+    """
+    import pandas as pd
+
+    from ._standardize import _import_rdkit
+
+    _import_rdkit()
+    from rdkit import Chem
+
+    path = Path(path)
+    open_file = gzip.open if path.suffix == ".gz" else open
+    with open_file(path, "rb") as file:
+        rows: list[dict[str, Any]] = []
+        for mol in Chem.ForwardSDMolSupplier(file):
+            if mol is None:
+                rows.append({"_Name": None, SDF_SMILES_COLUMN: None})
+            else:
+                rows.append(
+                    {
+                        **mol.GetPropsAsDict(),
+                        "_Name": mol.GetProp("_Name") if mol.HasProp("_Name") else None,
+                        SDF_SMILES_COLUMN: Chem.MolToSmiles(mol),
+                    }
+                )
+            if len(rows) == chunk_size:
+                yield pd.DataFrame(rows)
+                rows = []
+        if rows:
+            yield pd.DataFrame(rows)
+
+
+def iter_csv(
+    path: str | Path, chunk_size: int = 10_000, **kwargs: Any
+) -> Iterator[pd.DataFrame]:
+    """Read a CSV file in chunks of rows.
+
+    Args:
+        path: Path of the CSV file.
+        chunk_size: Number of rows per chunk.
+        **kwargs: Passed to :func:`pandas.read_csv`, e.g., `encoding="latin-1"`.
+    """
+    import pandas as pd
+
+    with pd.read_csv(path, chunksize=chunk_size, **kwargs) as reader:
+        yield from reader
+
+
+def iter_parquet(
+    path: str | Path, chunk_size: int = 10_000, columns: list[str] | None = None
+) -> Iterator[pd.DataFrame]:
+    """Read a Parquet file in chunks of rows, decoding a row group at a time.
+
+    Args:
+        path: Path of the Parquet file.
+        chunk_size: Maximum number of rows per chunk.
+        columns: Columns to read, all by default.
+    """
+    import pyarrow.parquet as pq
+
+    with pq.ParquetFile(path) as file:
+        for batch in file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+
+
+def _infer_format(path: str | Path) -> str:
+    suffixes = [s for s in Path(path).suffixes if s != ".gz"]
+    format = suffixes[-1].lstrip(".").lower() if suffixes else ""
+    return {"sd": "sdf", "pq": "parquet"}.get(format, format)
+
+
+def iter_chunks(
+    path: str | Path, format: str | None = None, chunk_size: int = 10_000
+) -> Iterator[pd.DataFrame]:
+    """Read a compound file in chunks of rows.
+
+    Args:
+        path: Path of an SDF, CSV, TSV or Parquet file.
+        format: One of `"sdf"`, `"csv"`, `"tsv"` or `"parquet"`, inferred from the
+            file suffix by default.
+        chunk_size: Number of rows per chunk.
+    """
+    if format is None:
+        format = _infer_format(path)
+    if format == "sdf":
+        return iter_sdf(path, chunk_size=chunk_size)
+    elif format == "csv":
+        return iter_csv(path, chunk_size=chunk_size)
+    elif format == "tsv":
+        return iter_csv(path, chunk_size=chunk_size, sep="\t")
+    elif format == "parquet":
+        return iter_parquet(path, chunk_size=chunk_size)
+    raise ValueError(
+        f"unsupported format '{format}', pass one of 'sdf', 'csv', 'tsv' or 'parquet'"
+    )
+
+
+def _column(chunk: pd.DataFrame, column: str) -> list[Any]:
+    if column not in chunk.columns:
+        raise KeyError(
+            f"column '{column}' not found, available columns: {list(chunk.columns)}"
+        )
+    # missing values of pandas become None
+    return chunk[column].astype(object).where(chunk[column].notna(), None).tolist()
+
+
+def load_compounds(
+    path: str | Path,
+    name_column: str | None = None,
+    smiles_column: str = "smiles",
+    chembl_id_column: str | None = None,
+    columns: Mapping[str, str] | None = None,
+    format: str | None = None,
+    chunk_size: int = 10_000,
+    n_jobs: int | None = None,
+) -> int:
+    """Register the compounds of a file chunk by chunk.
+
+    Only one chunk is held in memory at a time.
+    Compounds are deduplicated by InChIKey against the registry, see
+    :meth:`~pertdb.Compound.from_smiles_bulk`.
+    Compounds without name are named by their SMILES, rows with neither name nor
+    SMILES are skipped.
+
+    Args:
+        path: Path of an SDF, CSV, TSV or Parquet file.
+        name_column: Column with compound names, defaults to `"_Name"`, the molecule
+            titles, for SDF files and to `"name"` otherwise.
+        smiles_column: Column with SMILES.
+        chembl_id_column: Column with ChEMBL IDs.
+        columns: Maps further :class:`~pertdb.Compound` fields to columns, e.g.,
+            `{"moa": "mechanism"}`.
+        format: One of `"sdf"`, `"csv"`, `"tsv"` or `"parquet"`, inferred from the
+            file suffix by default.
+        chunk_size: Number of rows read, standardized and saved at once.
+        n_jobs: Number of worker processes used for standardization.
+
+    Returns:
+        The number of rows read.
+
+    Example::
+
+        import pertdb
+
+        pertdb.io.load_compounds(
+            "zinc.parquet", name_column="zinc_id", columns={"moa": "mechanism"}
+        )
+    """
+    from lamin_utils import logger
+
+    from . import Compound
+
+    if format is None:
+        format = _infer_format(path)
+    if name_column is None:
+        name_column = "_Name" if format == "sdf" else "name"
+    chunks = iter_chunks(path, format=format, chunk_size=chunk_size)
+    field_columns = dict(columns or {})
+    if chembl_id_column is not None:
+        field_columns["chembl_id"] = chembl_id_column
+    n_rows = 0
+    for chunk in chunks:
+        smiles = _column(chunk, smiles_column)
+        names = [
+            name if name is not None else s
+            for name, s in zip(_column(chunk, name_column), smiles, strict=True)
+        ]
+        fields = {field: _column(chunk, col) for field, col in field_columns.items()}
+        # skip rows with neither name nor SMILES
+        rows = [i for i, name in enumerate(names) if name is not None]
+        Compound.from_smiles_bulk(
+            names=[names[i] for i in rows],
+            smiles=[smiles[i] for i in rows],
+            chunk_size=chunk_size,
+            n_jobs=n_jobs,
+            **{field: [values[i] for i in rows] for field, values in fields.items()},
+        )
+        n_rows += len(chunk)
+        logger.info(f"loaded {n_rows} rows from {path}")
+    return n_rows
+
+
+def load_guide_library(
+    path: str | Path,
+    sequence_column: str = "sgRNA Target Sequence",
+    gene_column: str = "Target Gene Symbol",
+    on_target_score_column: str | None = "Rule Set 2 score",
+    off_target_score_column: str | None = None,
+    name_column: str | None = None,
+    type: str = "CRISPR-Cas9",
+    organism: str = "human",
+    control_labels: Iterable[str] = CONTROL_LABELS,
+    format: str | None = None,
+    chunk_size: int = 10_000,
+) -> int:
+    """Register the guides of a pooled CRISPR library chunk by chunk.
+
+    The default columns are those of the Brunello library. Guides whose gene is one
+    of `control_labels` are registered as non-targeting guides without targets.
+
+    Args:
+        path: Path of a CSV, TSV or Parquet file.
+        sequence_column: Column with guide sequences.
+        gene_column: Column with symbols of target genes.
+        on_target_score_column: Column with on-target scores.
+        off_target_score_column: Column with off-target scores.
+        name_column: Column with guide names, see
+            :meth:`~pertdb.GeneticPerturbation.from_guides_bulk` for the default.
+        type: The :class:`~pertdb.GeneticPerturbationSystem` of the library.
+        organism: Organism of the target genes.
+        control_labels: Gene labels of non-targeting guides, compared
+            case-insensitively.
+        format: One of `"csv"`, `"tsv"` or `"parquet"`, inferred from the file suffix
+            by default.
+        chunk_size: Number of rows read and saved at once.
+
+    Returns:
+        The number of rows read.
+
+    Example::
+
+        import pertdb
+
+        # TKOv3
+        pertdb.io.load_guide_library(
+            "tkov3_guide_sequence.tsv",
+            sequence_column="SEQUENCE",
+            gene_column="GENE",
+            on_target_score_column=None,
+        )
+    """
+    from lamin_utils import logger
+
+    from . import GeneticPerturbation
+
+    controls = {label.casefold() for label in control_labels}
+    n_rows = 0
+    for chunk in iter_chunks(path, format=format, chunk_size=chunk_size):
+        GeneticPerturbation.from_guides_bulk(
+            sequences=_column(chunk, sequence_column),
+            genes=[
+                None if gene is None or gene.casefold() in controls else gene
+                for gene in _column(chunk, gene_column)
+            ],
+            type=type,
+            on_target_scores=None
+            if on_target_score_column is None
+            else _column(chunk, on_target_score_column),
+            off_target_scores=None
+            if off_target_score_column is None
+            else _column(chunk, off_target_score_column),
+            names=None if name_column is None else _column(chunk, name_column),
+            organism=organism,
+            chunk_size=chunk_size,
+        )
+        n_rows += len(chunk)
+        logger.info(f"loaded {n_rows} guides from {path}")
+    return n_rows
+
+
+_CHEMBL_QUERY = """
+SELECT md.molregno, md.chembl_id, md.pref_name, cs.canonical_smiles
+FROM molecule_dictionary md
+JOIN compound_structures cs ON cs.molregno = md.molregno
+WHERE md.molregno > ?
+ORDER BY md.molregno
+LIMIT ?
+"""
+
+
+def _chembl_checkpoint_path(path: Path) -> Path:
+    from lamindb_setup import settings as setup_settings
+
+    return (
+        Path(setup_settings.cache_dir)
+        / "pertdb"
+        / f"{setup_settings.instance.uid}_chembl_{path.stem}_checkpoint.json"
+    )
+
+
+def load_chembl(
+    path: str | Path,
+    chunk_size: int = 10_000,
+    n_jobs: int | None = None,
+    resume: bool = True,
+) -> int:
+    """Register the molecules of a ChEMBL SQLite dump.
+
+    Reads molecules with structures from the `molecule_dictionary` and
+    `compound_structures` tables in the order of `molregno` and registers them
+    chunk by chunk with :meth:`~pertdb.Compound.from_smiles_bulk`, standardizing
+    in worker processes.
+    Sets `chembl_id` and `ontology_id` to the ChEMBL ID and `name` to the preferred
+    name or, if there's none, to the ChEMBL ID.
+
+    After each chunk, the last imported `molregno` is written to a checkpoint file
+    in the lamin cache directory so that an interrupted import resumes with the next
+    chunk. The checkpoint is removed once the import completes.
+
+    Args:
+        path: Path of the ChEMBL SQLite file, e.g., `chembl_35.db`.
+        chunk_size: Number of molecules read, standardized and saved at once.
+        n_jobs: Number of worker processes used for standardization.
+        resume: Whether to resume from the checkpoint of an interrupted import.
+
+    Returns:
+        The number of molecules read in this call.
+
+    Example::
+
+        import pertdb
+
+        pertdb.io.load_chembl("chembl_35/chembl_35_sqlite/chembl_35.db")
+    """
+    from lamin_utils import logger
+
+    from . import Compound
+
+    path = Path(path)
+    checkpoint_path = _chembl_checkpoint_path(path)
+    last_molregno = 0
+    if resume and checkpoint_path.exists():
+        last_molregno = json.loads(checkpoint_path.read_text())["last_molregno"]
+        logger.important(f"resuming ChEMBL import after molregno {last_molregno}")
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    n_rows = 0
+    with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+        while True:
+            rows = conn.execute(_CHEMBL_QUERY, (last_molregno, chunk_size)).fetchall()
+            if not rows:
+                break
+            chembl_ids = [row[1] for row in rows]
+            Compound.from_smiles_bulk(
+                names=[row[2] or row[1] for row in rows],
+                smiles=[row[3] for row in rows],
+                chunk_size=chunk_size,
+                n_jobs=n_jobs,
+                chembl_id=chembl_ids,
+                ontology_id=chembl_ids,
+            )
+            last_molregno = rows[-1][0]
+            n_rows += len(rows)
+            tmp_path = checkpoint_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"last_molregno": last_molregno}))
+            tmp_path.replace(checkpoint_path)
+            logger.info(f"imported {n_rows} ChEMBL molecules")
+    checkpoint_path.unlink(missing_ok=True)
+    return n_rows
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:43
+
+import lamindb.base.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pertdb", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="compound",
+            name="standardization_pending",
+            field=lamindb.base.fields.BooleanField(
+                blank=True, db_index=True, default=False
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:49
+
+import lamindb.base.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pertdb", "0002_compound_standardization_pending"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="compound",
+            name="rdkit_version",
+            field=lamindb.base.fields.CharField(
+                blank=True, db_index=True, default=None, max_length=32, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="compound",
+            name="standardizer_version",
+            field=lamindb.base.fields.CharField(
+                blank=True, db_index=True, default=None, max_length=32, null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:02
+
+import hashlib
+
+import lamindb.base.fields
+from django.db import migrations, models
+
+
+def hash64(value):
+    # frozen copy of pertdb._hashing.hash64
+    if value is None:
+        return None
+    digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def backfill_hashes(apps, schema_editor):
+    for model_name, field in [
+        ("Compound", "canonical_smiles"),
+        ("GeneticPerturbation", "sequence"),
+    ]:
+        model = apps.get_model("pertdb", model_name)
+        records = []
+        for record in (
+            model.objects.filter(**{f"{field}__isnull": False})
+            .only("id", field)
+            .iterator(chunk_size=10_000)
+        ):
+            setattr(record, f"{field}_hash", hash64(getattr(record, field)))
+            records.append(record)
+            if len(records) == 10_000:
+                model.objects.bulk_update(records, [f"{field}_hash"])
+                records = []
+        model.objects.bulk_update(records, [f"{field}_hash"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pertdb", "0003_compound_standardizer_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="compound",
+            name="canonical_smiles_hash",
+            field=lamindb.base.fields.BigIntegerField(
+                blank=True, db_index=True, default=None, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="geneticperturbation",
+            name="sequence_hash",
+            field=lamindb.base.fields.BigIntegerField(
+                blank=True, db_index=True, default=None, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="compound",
+            name="canonical_smiles",
+            field=lamindb.base.fields.TextField(blank=True, default=None, null=True),
+        ),
+        migrations.AlterField(
+            model_name="geneticperturbation",
+            name="sequence",
+            field=models.TextField(null=True),
+        ),
+        migrations.RunPython(backfill_hashes, migrations.RunPython.noop),
+    ]
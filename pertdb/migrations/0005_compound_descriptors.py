@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:25
+
+import lamindb.base.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pertdb", "0004_hash_columns"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="compound",
+            name="hba",
+            field=lamindb.base.fields.IntegerField(
+                blank=True, db_index=True, default=None, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="compound",
+            name="hbd",
+            field=lamindb.base.fields.IntegerField(
+                blank=True, db_index=True, default=None, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="compound",
+            name="heavy_atoms",
+            field=lamindb.base.fields.IntegerField(
+                blank=True, db_index=True, default=None, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="compound",
+            name="logp",
+            field=lamindb.base.fields.FloatField(
+                blank=True, db_index=True, default=None, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="compound",
+            name="rotatable_bonds",
+            field=lamindb.base.fields.IntegerField(
+                blank=True, db_index=True, default=None, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="compound",
+            name="tpsa",
+            field=lamindb.base.fields.FloatField(
+                blank=True, db_index=True, default=None, null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:30
+
+import django.db.models.deletion
+import lamindb.base.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pertdb", "0005_compound_descriptors"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompoundElement",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "element",
+                    lamindb.base.fields.CharField(
+                        blank=True, default=None, max_length=3
+                    ),
+                ),
+                ("count", lamindb.base.fields.IntegerField(blank=True)),
+                (
+                    "compound",
+                    lamindb.base.fields.ForeignKey(
+                        blank=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="elements",
+                        to="pertdb.compound",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["element", "count"],
+                        name="pertdb_comp_element_d6cdad_idx",
+                    )
+                ],
+                "unique_together": {("compound", "element")},
+            },
+        ),
+    ]
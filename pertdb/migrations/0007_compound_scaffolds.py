@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:36
+
+import lamindb.base.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pertdb", "0006_compoundelement"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="compound",
+            name="generic_scaffold",
+            field=lamindb.base.fields.TextField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name="compound",
+            name="generic_scaffold_hash",
+            field=lamindb.base.fields.BigIntegerField(
+                blank=True, db_index=True, default=None, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="compound",
+            name="murcko_scaffold",
+            field=lamindb.base.fields.TextField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name="compound",
+            name="murcko_scaffold_hash",
+            field=lamindb.base.fields.BigIntegerField(
+                blank=True, db_index=True, default=None, null=True
+            ),
+        ),
+    ]
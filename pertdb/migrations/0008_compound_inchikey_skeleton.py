@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:38
+
+import lamindb.base.fields
+from django.db import migrations
+from django.db.models.functions import Substr
+
+
+def backfill_inchikey_skeleton(apps, schema_editor):
+    Compound = apps.get_model("pertdb", "Compound")
+    Compound.objects.filter(inchikey__isnull=False).update(
+        inchikey_skeleton=Substr("inchikey", 1, 14)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pertdb", "0007_compound_scaffolds"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="compound",
+            name="inchikey_skeleton",
+            field=lamindb.base.fields.CharField(
+                blank=True, db_index=True, default=None, max_length=14, null=True
+            ),
+        ),
+        migrations.RunPython(backfill_inchikey_skeleton, migrations.RunPython.noop),
+    ]
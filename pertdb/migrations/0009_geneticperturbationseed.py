@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:47
+
+import django.db.models.deletion
+import lamindb.base.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pertdb", "0008_compound_inchikey_skeleton"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GeneticPerturbationSeed",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("offset", lamindb.base.fields.IntegerField(blank=True)),
+                ("kmer", lamindb.base.fields.IntegerField(blank=True)),
+                (
+                    "perturbation",
+                    lamindb.base.fields.ForeignKey(
+                        blank=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seeds",
+                        to="pertdb.geneticperturbation",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["kmer", "offset"], name="pertdb_gene_kmer_095f33_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:55
+
+import hashlib
+
+import lamindb.base.fields
+from django.db import migrations
+
+_COMPLEMENT = str.maketrans("ACGTRYKMSWBDHVN", "TGCAYRMKSWVHDBN")
+
+
+def canonical_sequence_hash(sequence):
+    # frozen copies of pertdb._sequences.canonical_sequence & pertdb._hashing.hash64
+    sequence = sequence.upper().replace("U", "T")
+    canonical = min(sequence, sequence.translate(_COMPLEMENT)[::-1])
+    digest = hashlib.blake2b(canonical.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def backfill_canonical_sequence_hashes(apps, schema_editor):
+    model = apps.get_model("pertdb", "GeneticPerturbation")
+    records = []
+    for record in (
+        model.objects.filter(sequence__isnull=False)
+        .only("id", "sequence")
+        .iterator(chunk_size=10_000)
+    ):
+        record.canonical_sequence_hash = canonical_sequence_hash(record.sequence)
+        records.append(record)
+        if len(records) == 10_000:
+            model.objects.bulk_update(records, ["canonical_sequence_hash"])
+            records = []
+    model.objects.bulk_update(records, ["canonical_sequence_hash"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pertdb", "0009_geneticperturbationseed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="geneticperturbation",
+            name="canonical_sequence_hash",
+            field=lamindb.base.fields.BigIntegerField(
+                blank=True, db_index=True, default=None, null=True
+            ),
+        ),
+        migrations.RunPython(
+            backfill_canonical_sequence_hashes, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:59
+
+import lamindb.base.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pertdb", "0010_geneticperturbation_canonical_sequence_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="geneticperturbation",
+            name="sequence_packed",
+            field=lamindb.base.fields.BinaryField(blank=True, null=True),
+        ),
+    ]
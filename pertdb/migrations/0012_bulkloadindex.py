@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:30
+
+import lamindb.base.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pertdb", "0011_geneticperturbation_sequence_packed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BulkLoadIndex",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "name",
+                    lamindb.base.fields.CharField(
+                        blank=True, default=None, max_length=255, unique=True
+                    ),
+                ),
+                (
+                    "table",
+                    lamindb.base.fields.CharField(
+                        blank=True, default=None, max_length=255
+                    ),
+                ),
+                ("sql", lamindb.base.fields.TextField(blank=True, default=None)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:42
+
+import lamindb.base.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pertdb", "0012_bulkloadindex"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="compound",
+            name="smiles",
+            field=lamindb.base.fields.TextField(blank=True, default=None, null=True),
+        ),
+    ]
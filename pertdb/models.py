@@ -1,36 +1,31 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import timedelta  # noqa
-from typing import overload
-
-try:
-    from rdkit import Chem, rdBase
-    from rdkit.Chem import Descriptors
-    from rdkit.Chem.MolStandardize import rdMolStandardize
-    from rdkit.Chem.rdMolDescriptors import CalcMolFormula
-
-    rdBase.DisableLog("rdApp.info")
-    rdBase.DisableLog("rdApp.warning")
-    RDKIT_AVAILABLE = True
-except ImportError:
-    RDKIT_AVAILABLE = False
+from typing import TYPE_CHECKING, Any, overload
 
+import numpy as np
 from bionty.models import (
     BioRecord,
     Gene,
     HasOntologyId,
+    Organism,
     Pathway,
     Protein,
     Source,
 )
-from django.db import models
+from django.db import connection, models
 from django.db.models import CASCADE, PROTECT, QuerySet
 from lamin_utils import logger
 from lamindb.base.fields import (
+    BigIntegerField,
+    BinaryField,
+    BooleanField,
     CharField,
     DurationField,
     FloatField,
     ForeignKey,
+    IntegerField,
     TextField,
 )
 from lamindb.models import (
@@ -42,8 +37,66 @@ from lamindb.models import (
     TracksUpdates,
 )
 
+from ._formula import METALS, parse_formula
+from ._hashing import hash64
+from ._sequences import canonical_sequence, normalize_sequence, pack_sequence
+from ._settings import settings
+from ._standardize import (
+    DESCRIPTORS,
+    RDKIT_AVAILABLE,
+    TRANSIENT_FAILURES,
+    compute_descriptors_batch,
+    compute_fields_cached,
+    field_names,
+    standardize_batch,
+    standardize_batch_with_failures,
+    standardize_mol,
+    standardize_smiles,
+    version_fields,
+)
 from .types import BiologicType, GeneticPerturbationSystem  # noqa
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+
+# maps indexed hash fields of Compound to the text fields they're computed from
+HASHED_FIELDS = {
+    "canonical_smiles_hash": "canonical_smiles",
+    "murcko_scaffold_hash": "murcko_scaffold",
+    "generic_scaffold_hash": "generic_scaffold",
+}
+# fields of Compound derived from other fields for indexed lookups
+LOOKUP_FIELDS = [*HASHED_FIELDS, "inchikey_skeleton"]
+
+# runs Compound.standardize_pending(background=True)
+_background_executor: ThreadPoolExecutor | None = None
+
+# number of writes to compounds by this process, invalidates cached fingerprint
+# indexes, see pertdb._fingerprints.get_index
+_n_compound_writes = 0
+
+
+def _compounds_written() -> None:
+    global _n_compound_writes
+
+    _n_compound_writes += 1
+
+
+def _iter_id_chunks(queryset: QuerySet, chunk_size: int) -> Iterator[list[Any]]:
+    """Iterate over the records of a queryset in chunks ordered by id.
+
+    Chunks are paginated by id rather than offset, so that each chunk is an indexed
+    range scan and updating records out of the queryset doesn't shift later chunks.
+    """
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id).order_by("id")[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].id
+
 
 class Compound(BioRecord, HasOntologyId, TracksRun, TracksUpdates):
     """Models a (chemical) compound such as a drug.
@@ -73,18 +126,50 @@ class Compound(BioRecord, HasOntologyId, TracksRun, TracksUpdates):
     """Type of the compound."""
     chembl_id: str | None = CharField(null=True, max_length=32, db_index=True)
     """Chembl ontology ID of the compound"""
-    smiles: str | None = TextField(null=True, db_index=True)
+    smiles: str | None = TextField(null=True)
     """Raw SMILES string as provided by user."""
-    canonical_smiles: str | None = TextField(null=True, db_index=True)
+    canonical_smiles: str | None = TextField(null=True)
     """Normalized and standardized canonical SMILES string."""
+    canonical_smiles_hash: int | None = BigIntegerField(null=True, db_index=True)
+    """64-bit hash of `canonical_smiles` for equality lookups, see :meth:`~pertdb.Compound.filter_by_canonical_smiles`."""
     inchikey: str | None = TextField(null=True, db_index=True)
     """InChIKey of the compound from the canonical SMILES."""
+    inchikey_skeleton: str | None = CharField(max_length=14, null=True, db_index=True)
+    """First block of `inchikey`, the connectivity skeleton shared by stereoisomers & tautomers, see :meth:`~pertdb.Compound.filter_by_inchikey_skeleton`."""
     molweight: float | None = FloatField(null=True, default=None, db_index=True)
     """MolWeight of the compound from the canonical SMILES."""
     molformula: str | None = TextField(null=True, db_index=True)
     """MolFormula of the compound from the canonical SMILES."""
+    logp: float | None = FloatField(null=True, default=None, db_index=True)
+    """Crippen logP of the compound from the canonical SMILES."""
+    tpsa: float | None = FloatField(null=True, default=None, db_index=True)
+    """Topological polar surface area of the compound from the canonical SMILES."""
+    hbd: int | None = IntegerField(null=True, default=None, db_index=True)
+    """Number of hydrogen bond donors, N-H and O-H bonds, from the canonical SMILES."""
+    hba: int | None = IntegerField(null=True, default=None, db_index=True)
+    """Number of hydrogen bond acceptors, N and O atoms, from the canonical SMILES."""
+    rotatable_bonds: int | None = IntegerField(null=True, default=None, db_index=True)
+    """Number of rotatable bonds of the compound from the canonical SMILES."""
+    heavy_atoms: int | None = IntegerField(null=True, default=None, db_index=True)
+    """Number of heavy atoms of the compound from the canonical SMILES."""
+    murcko_scaffold: str | None = TextField(null=True)
+    """Bemis-Murcko scaffold SMILES, the ring systems & linkers, empty for acyclic compounds."""
+    murcko_scaffold_hash: int | None = BigIntegerField(null=True, db_index=True)
+    """64-bit hash of `murcko_scaffold`, see :meth:`~pertdb.Compound.filter_by_scaffold`."""
+    generic_scaffold: str | None = TextField(null=True)
+    """Murcko scaffold with all atoms carbon and all bonds single."""
+    generic_scaffold_hash: int | None = BigIntegerField(null=True, db_index=True)
+    """64-bit hash of `generic_scaffold`, see :meth:`~pertdb.Compound.filter_by_scaffold`."""
     moa: str | None = TextField(null=True, db_index=True)
     """Mechanism of action of the compound."""
+    standardization_pending: bool = BooleanField(default=False, db_index=True)
+    """Whether the SMILES still awaits standardization, see :meth:`~pertdb.Compound.standardize_pending`."""
+    standardizer_version: str | None = CharField(
+        max_length=32, null=True, db_index=True
+    )
+    """Version of the standardization pipeline that computed the canonical fields."""
+    rdkit_version: str | None = CharField(max_length=32, null=True, db_index=True)
+    """RDKit version that computed the canonical fields."""
     targets: PerturbationTarget = models.ManyToManyField(
         "PerturbationTarget", related_name="compounds"
     )
@@ -124,9 +209,26 @@ class Compound(BioRecord, HasOntologyId, TracksRun, TracksUpdates):
         **kwargs,
     ):
         smiles = kwargs.get("smiles")
+        # standardized fields are passed by the bulk paths
+        standardized = "canonical_smiles" in kwargs
         super().__init__(*args, **kwargs)
-        if smiles and self._state.adding:  # Only process for new instances
-            self._process_smiles(smiles)
+        if smiles and self._state.adding and not standardized:
+            # Only process for new instances
+            if settings.defer_standardization:
+                self._defer_smiles(smiles)
+            else:
+                self._process_smiles(smiles)
+        elif not args:
+            self._set_lookup_fields()
+            self._elements_stale = self.molformula is not None
+
+    def _defer_smiles(self, smiles_string: str) -> None:
+        """Store the raw SMILES and mark it for standardization in the background."""
+        self.smiles = smiles_string
+        for field in [*field_names(), *version_fields(), *LOOKUP_FIELDS]:
+            setattr(self, field, None)
+        self.standardization_pending = True
+        self._elements_stale = True
 
     def _process_smiles(self, smiles_string: str) -> None:
         """Process and normalize SMILES string.
@@ -138,36 +240,55 @@ class Compound(BioRecord, HasOntologyId, TracksRun, TracksUpdates):
             raise ImportError(
                 "RDKit is not available. Please install: pip install rdkit"
             )
+        # Store the original SMILES
+        self.smiles = smiles_string
         try:
-            # Store the original SMILES
-            self.smiles = smiles_string
-            # Normalize and store canonical SMILES
-            self.canonical_smiles = Compound.standardize_smiles(smiles_string)
-            self.inchikey = Chem.MolToInchiKey(
-                Chem.MolFromSmiles(self.canonical_smiles)
-            )
-            self.molweight = Descriptors.MolWt(
-                Chem.MolFromSmiles(self.canonical_smiles)
-            )
-            self.molformula = CalcMolFormula(Chem.MolFromSmiles(self.canonical_smiles))
-
+            # Normalize and store canonical SMILES and derived fields
+            self._set_standardized_fields(compute_fields_cached(smiles_string))
         except ValueError as e:
-            self.smiles = smiles_string
-            self.canonical_smiles = None
-            self.inchikey = None
-            self.molweight = None
-            self.molformula = None
+            self._set_standardized_fields(None)
             logger.warning(
                 f"could not normalize SMILES for compound '{self.name}': {str(e)}"
             )
 
+    def _set_standardized_fields(
+        self, fields: dict[str, Any] | None, retry: bool = False
+    ) -> None:
+        """Set the outputs of standardization, `None` if standardization failed.
+
+        If `retry` is set, e.g., after a timeout, the version fields are left empty
+        so that :meth:`~pertdb.Compound.restandardize` tries again.
+        """
+        for field in field_names():
+            setattr(self, field, None if fields is None else fields[field])
+        for field, value in version_fields().items():
+            setattr(self, field, None if retry else value)
+        self._set_lookup_fields()
+        self.standardization_pending = False
+        self._elements_stale = True
+
+    def _set_lookup_fields(self) -> None:
+        for hash_field, field in HASHED_FIELDS.items():
+            setattr(self, hash_field, hash64(getattr(self, field)))
+        self.inchikey_skeleton = self.inchikey[:14] if self.inchikey else None
+
     def save(self, *args, **kwargs):
         """Override save to ensure SMILES processing happens before database save."""
         # If SMILES was set but not processed yet, process it now
-        if self.smiles and not self.canonical_smiles:
+        if (
+            self.smiles
+            and not self.canonical_smiles
+            and not self.standardization_pending
+        ):
             self._process_smiles(self.smiles)
+        # source fields of lookup fields might have been assigned directly
+        self._set_lookup_fields()
 
+        created = self._state.adding
         super().save(*args, **kwargs)
+        _compounds_written()
+        if getattr(self, "_elements_stale", False):
+            CompoundElement.update_for([self], created=created)
         return self
 
     def update_smiles(self, new_smiles: str) -> None:
@@ -176,9 +297,664 @@ class Compound(BioRecord, HasOntologyId, TracksRun, TracksUpdates):
         Args:
             new_smiles: New SMILES string to set
         """
-        self._process_smiles(new_smiles)
+        if settings.defer_standardization:
+            self._defer_smiles(new_smiles)
+        else:
+            self._process_smiles(new_smiles)
         self.save()
 
+    @classmethod
+    def standardize_pending(
+        cls,
+        chunk_size: int = 1000,
+        n_jobs: int | None = None,
+        background: bool = False,
+    ) -> int | Future[int]:
+        """Standardize the SMILES of compounds that were saved with deferred standardization.
+
+        Compounds are marked as pending if they're created while
+        `pertdb.settings.defer_standardization` is enabled.
+        This reads pending compounds in chunks, standardizes them in worker processes and
+        writes the standardized fields back with a bulk update.
+
+        Args:
+            chunk_size: Number of compounds read and updated at once.
+            n_jobs: Number of worker processes used for standardization.
+            background: Whether to return immediately and standardize in a background thread.
+
+        Returns:
+            The number of standardized compounds or, if `background=True`,
+            a future that resolves to it.
+
+        Example::
+
+            import pertdb
+
+            pertdb.settings.defer_standardization = True
+            compound = pertdb.Compound(name="Acetic acid", smiles="CC(=O)O").save()
+            future = pertdb.Compound.standardize_pending(background=True)
+            future.result()
+        """
+        if background:
+            global _background_executor
+
+            if _background_executor is None:
+                _background_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="pertdb-standardize"
+                )
+            return _background_executor.submit(
+                cls._standardize_pending_in_thread, chunk_size, n_jobs
+            )
+        n_standardized = cls._standardize_in_chunks(
+            cls.filter(standardization_pending=True), chunk_size, n_jobs
+        )
+        if n_standardized > 0:
+            logger.info(f"standardized {n_standardized} pending compounds")
+        return n_standardized
+
+    @classmethod
+    def restandardize(
+        cls,
+        chunk_size: int = 1000,
+        n_jobs: int | None = None,
+    ) -> int:
+        """Re-standardize compounds standardized by another pipeline or RDKit version.
+
+        Selects compounds whose `standardizer_version` or `rdkit_version` differ from the
+        current ones, standardizes them in chunks in worker processes and writes the
+        results back with a bulk update.
+        The job is resumable: if interrupted, calling it again only processes the
+        compounds that are still stale.
+
+        Args:
+            chunk_size: Number of compounds read and updated at once.
+            n_jobs: Number of worker processes used for standardization.
+
+        Returns:
+            The number of re-standardized compounds.
+
+        Example::
+
+            import pertdb
+
+            # after upgrading RDKit
+            pertdb.Compound.restandardize(chunk_size=10_000)
+        """
+        if not RDKIT_AVAILABLE:
+            raise ImportError(
+                "RDKit is not available. Please install: pip install rdkit"
+            )
+        stale = cls.filter(smiles__isnull=False, standardization_pending=False).exclude(
+            **version_fields()
+        )
+        n_standardized = cls._standardize_in_chunks(stale, chunk_size, n_jobs)
+        logger.info(f"re-standardized {n_standardized} compounds")
+        return n_standardized
+
+    @classmethod
+    def _standardize_in_chunks(
+        cls, queryset: QuerySet, chunk_size: int, n_jobs: int | None
+    ) -> int:
+        """Standardize the compounds of a queryset and bulk-update them chunk by chunk."""
+        update_fields = [
+            *field_names(),
+            *version_fields(),
+            *LOOKUP_FIELDS,
+            "standardization_pending",
+        ]
+        n_standardized = 0
+        for chunk in _iter_id_chunks(queryset, chunk_size):
+            results, failures = standardize_batch_with_failures(
+                [c.smiles for c in chunk], n_jobs=n_jobs
+            )
+            for record, result, failure in zip(chunk, results, failures, strict=True):
+                record._set_standardized_fields(
+                    result, retry=failure in TRANSIENT_FAILURES
+                )
+            cls.objects.bulk_update(chunk, update_fields)
+            _compounds_written()
+            CompoundElement.update_for(chunk)
+            n_standardized += len(chunk)
+        return n_standardized
+
+    @classmethod
+    def backfill_descriptors(
+        cls,
+        chunk_size: int = 10_000,
+        n_jobs: int | None = None,
+    ) -> int:
+        """Compute missing descriptors of standardized compounds.
+
+        Selects compounds with canonical SMILES that lack a value for any descriptor,
+        e.g., because they were registered before the descriptor was added.
+        Descriptors are computed from the canonical SMILES in worker processes,
+        without standardizing again, and written back with a bulk update per chunk.
+        Only missing values are filled in, compounds whose canonical SMILES can't be
+        parsed are left unchanged.
+
+        Args:
+            chunk_size: Number of compounds read and updated at once.
+            n_jobs: Number of worker processes.
+
+        Returns:
+            The number of updated compounds.
+
+        Example::
+
+            import pertdb
+
+            pertdb.Compound.backfill_descriptors()
+        """
+        if not RDKIT_AVAILABLE:
+            raise ImportError(
+                "RDKit is not available. Please install: pip install rdkit"
+            )
+        fields = list(DESCRIPTORS)
+        missing = models.Q()
+        for field in fields:
+            missing |= models.Q(**{f"{field}__isnull": True})
+        queryset = (
+            cls.filter(canonical_smiles__isnull=False)
+            .filter(missing)
+            .only("id", *HASHED_FIELDS.values(), *fields)
+        )
+        n_updated = n_failed = 0
+        for chunk in _iter_id_chunks(queryset, chunk_size):
+            results = compute_descriptors_batch(
+                [record.canonical_smiles for record in chunk], fields, n_jobs=n_jobs
+            )
+            updated = []
+            new_formulas = []
+            for record, result in zip(chunk, results, strict=True):
+                if result is None:
+                    n_failed += 1
+                    continue
+                if "molformula" in fields and record.molformula is None:
+                    new_formulas.append(record)
+                # keep existing values, only fill in the missing ones
+                for field in fields:
+                    if getattr(record, field) is None:
+                        setattr(record, field, result[field])
+                record._set_lookup_fields()
+                updated.append(record)
+            cls.objects.bulk_update(updated, [*fields, *LOOKUP_FIELDS])
+            _compounds_written()
+            CompoundElement.update_for(new_formulas)
+            n_updated += len(updated)
+        if n_failed:
+            logger.warning(
+                f"could not parse the canonical SMILES of {n_failed} compounds"
+            )
+        logger.info(f"computed descriptors of {n_updated} compounds")
+        return n_updated
+
+    @classmethod
+    def backfill_elements(cls, chunk_size: int = 10_000) -> int:
+        """Populate the element counts of compounds that have a formula but no counts.
+
+        Needed once for compounds registered before :class:`~pertdb.CompoundElement`
+        existed, counts are parsed from the stored formula without RDKit.
+
+        Args:
+            chunk_size: Number of compounds processed at once.
+
+        Returns:
+            The number of processed compounds.
+        """
+        queryset = cls.filter(molformula__isnull=False, elements__isnull=True).only(
+            "id", "molformula"
+        )
+        n_updated = 0
+        for chunk in _iter_id_chunks(queryset, chunk_size):
+            CompoundElement.update_for(chunk, created=True)
+            n_updated += len(chunk)
+        logger.info(f"computed element counts of {n_updated} compounds")
+        return n_updated
+
+    @classmethod
+    def filter_by_formula(
+        cls,
+        elements: dict[str, int | tuple[int | None, int | None]] | None = None,
+        exclude: Iterable[str] = (),
+        metals: bool = True,
+    ) -> QuerySet:
+        """Compounds whose molecular formula satisfies element count constraints.
+
+        Each constraint is a subquery on the `(element, count)` index of
+        :class:`~pertdb.CompoundElement`.
+        Only compounds with a molecular formula are returned.
+
+        Args:
+            elements: Maps element symbols to exact counts or to inclusive
+                `(min, max)` ranges, where `None` means unbounded.
+            exclude: Element symbols that must not occur.
+            metals: Whether metals, e.g., Na, Fe or Pt, may occur.
+
+        Example::
+
+            import pertdb
+
+            # chlorinated, at least 20 carbons, no metals
+            pertdb.Compound.filter_by_formula(
+                {"Cl": (1, None), "C": (20, None)}, metals=False
+            )
+        """
+        queryset = cls.filter(molformula__isnull=False)
+        for element, count in (elements or {}).items():
+            low, high = (count, count) if isinstance(count, int) else count
+            if low is not None and low > 0:
+                matches = CompoundElement.objects.filter(
+                    element=element, count__gte=low
+                )
+                if high is not None:
+                    matches = matches.filter(count__lte=high)
+                queryset = queryset.filter(id__in=matches.values("compound_id"))
+            elif high is not None:
+                # compounds without the element have no row for it
+                too_many = CompoundElement.objects.filter(
+                    element=element, count__gt=high
+                )
+                queryset = queryset.exclude(id__in=too_many.values("compound_id"))
+        excluded = set(exclude) | (set() if metals else METALS)
+        if excluded:
+            queryset = queryset.exclude(
+                id__in=CompoundElement.objects.filter(element__in=excluded).values(
+                    "compound_id"
+                )
+            )
+        return queryset
+
+    @classmethod
+    def filter_by_inchikey_skeleton(cls, inchikey: str | Iterable[str]) -> QuerySet:
+        """Compounds with the same connectivity as given InChIKeys.
+
+        Matches on the first block of the InChIKey, which is shared by stereoisomers
+        and by forms that differ in protonation, using the index on
+        `inchikey_skeleton`.
+
+        Args:
+            inchikey: One or several InChIKeys or their 14-character first blocks.
+
+        Example::
+
+            import pertdb
+
+            # (R)- and (S)-2-butanol
+            pertdb.Compound.filter_by_inchikey_skeleton("BTANRVKWQNVYAZ-SCSAIBSYSA-N")
+        """
+        keys = [inchikey] if isinstance(inchikey, str) else list(inchikey)
+        return cls.filter(inchikey_skeleton__in={key[:14] for key in keys})
+
+    @classmethod
+    def filter_by_scaffold(cls, smiles: str, generic: bool = False) -> QuerySet:
+        """Compounds that share the scaffold of a molecule.
+
+        Computes the Murcko scaffold of the standardized molecule and uses the index on
+        `murcko_scaffold_hash` or `generic_scaffold_hash`.
+
+        Args:
+            smiles: SMILES of a compound or of a scaffold.
+            generic: Whether to compare generic scaffolds, ignoring atom & bond types.
+
+        Example::
+
+            import pertdb
+
+            # compounds with the scaffold of aspirin, a benzene ring
+            pertdb.Compound.filter_by_scaffold("CC(=O)Oc1ccccc1C(=O)O")
+        """
+        field = "generic_scaffold" if generic else "murcko_scaffold"
+        try:
+            mol = standardize_mol(smiles)
+        except ValueError as e:
+            raise ValueError(f"invalid SMILES '{smiles}': {e}") from None
+        scaffold = DESCRIPTORS[field](mol)
+        return cls.filter(**{f"{field}_hash": hash64(scaffold), field: scaffold})
+
+    @classmethod
+    def scaffold_counts(
+        cls, queryset: QuerySet | None = None, generic: bool = False
+    ) -> QuerySet:
+        """Number of compounds per scaffold, most frequent first.
+
+        Groups by the indexed scaffold hash. Acyclic compounds have the empty
+        scaffold `""` and aren't counted.
+
+        Args:
+            queryset: Compounds to group, all compounds by default.
+            generic: Whether to group by generic scaffolds.
+
+        Returns:
+            Dictionaries with keys `scaffold` and `n_compounds`.
+
+        Example::
+
+            import pertdb
+
+            pertdb.Compound.scaffold_counts()[:10]
+        """
+        field = "generic_scaffold" if generic else "murcko_scaffold"
+        if queryset is None:
+            queryset = cls.filter()
+        return (
+            queryset.filter(**{f"{field}_hash__isnull": False})
+            .exclude(**{f"{field}_hash": hash64("")})
+            .values(f"{field}_hash")
+            .annotate(scaffold=models.Min(field), n_compounds=models.Count("id"))
+            .order_by("-n_compounds")
+            .values("scaffold", "n_compounds")
+        )
+
+    @classmethod
+    def filter_lipinski(cls, max_violations: int = 0) -> QuerySet:
+        """Compounds that satisfy Lipinski's rule of five.
+
+        The rule requires a molecular weight of at most 500, a logP of at most 5, at
+        most 5 hydrogen bond donors and at most 10 hydrogen bond acceptors.
+        With `max_violations=0`, this is a conjunction of range conditions on
+        indexed columns.
+
+        Args:
+            max_violations: Number of criteria a compound may violate.
+
+        Example::
+
+            import pertdb
+
+            pertdb.Compound.filter_lipinski(max_violations=1).to_dataframe()
+        """
+        criteria = [
+            models.Q(molweight__lte=500),
+            models.Q(logp__lte=5),
+            models.Q(hbd__lte=5),
+            models.Q(hba__lte=10),
+        ]
+        if max_violations == 0:
+            return cls.filter(*criteria)
+        violations = sum(
+            (
+                models.Case(
+                    models.When(criterion, then=0),
+                    default=1,
+                    output_field=models.IntegerField(),
+                )
+                for criterion in criteria
+            ),
+            start=models.Value(0),
+        )
+        # compounds without descriptors violate all criteria
+        return (
+            cls.filter(molweight__isnull=False)
+            .alias(lipinski_violations=violations)
+            .filter(lipinski_violations__lte=max_violations)
+        )
+
+    @classmethod
+    def filter_lead_like(cls) -> QuerySet:
+        """Lead-like compounds.
+
+        Requires a molecular weight between 250 and 350, a logP of at most 3.5 and at
+        most 7 rotatable bonds, a conjunction of range conditions on indexed columns.
+
+        Example::
+
+            import pertdb
+
+            pertdb.Compound.filter_lead_like().filter(tpsa__lte=90).to_dataframe()
+        """
+        return cls.filter(
+            molweight__range=(250, 350), logp__lte=3.5, rotatable_bonds__lte=7
+        )
+
+    @classmethod
+    def _standardize_pending_in_thread(cls, chunk_size: int, n_jobs: int | None) -> int:
+        try:
+            return cls.standardize_pending(chunk_size=chunk_size, n_jobs=n_jobs)
+        finally:
+            # Django opens a connection per thread
+            connection.close()
+
+    @classmethod
+    def from_smiles_bulk(
+        cls,
+        names: Iterable[str],
+        smiles: Iterable[str | None],
+        chunk_size: int = 10_000,
+        n_jobs: int | None = None,
+        **fields: Iterable[Any],
+    ) -> list[Compound]:
+        """Create compounds in bulk, deduplicated by InChIKey.
+
+        Standardizes the SMILES with :meth:`~pertdb.Compound.standardize_smiles_batch`,
+        looks up existing compounds with one query per chunk on the indexed `inchikey`
+        field and bulk-creates the remaining compounds.
+        Compounds with invalid SMILES are created without standardized fields.
+        As uids are derived from names, a compound named like an existing compound
+        resolves to the existing compound.
+
+        Args:
+            names: Names of the compounds.
+            smiles: Raw SMILES strings of the compounds.
+            chunk_size: Number of compounds standardized and saved at once.
+            n_jobs: Number of worker processes used for standardization.
+            **fields: Further values per compound, e.g., `chembl_id=[...]`.
+
+        Returns:
+            Existing and newly created compounds in input order.
+
+        Example::
+
+            import pertdb
+
+            compounds = pertdb.Compound.from_smiles_bulk(
+                names=["Acetic acid", "tert-Butanol"],
+                smiles=["CC(=O)[O-].[Na+]", "CC(C)(C)O"],
+                chembl_id=["CHEMBL539", "CHEMBL16502"],
+            )
+        """
+        import lamindb as ln
+
+        names = list(names)
+        smiles = list(smiles)
+        values = {key: list(value) for key, value in fields.items()}
+        for key, value in {"smiles": smiles, **values}.items():
+            if len(value) != len(names):
+                raise ValueError(
+                    f"got {len(value)} values for '{key}' but {len(names)} names"
+                )
+        versions = version_fields()
+        no_versions = dict.fromkeys(versions)
+        records: list[Compound] = []
+        n_created = 0
+        for start in range(0, len(names), chunk_size):
+            stop = start + chunk_size
+            results, failures = standardize_batch_with_failures(
+                smiles[start:stop], n_jobs=n_jobs
+            )
+            inchikeys = {r["inchikey"] for r in results if r is not None}
+            existing = {
+                record.inchikey: record for record in cls.filter(inchikey__in=inchikeys)
+            }
+            # uids are derived from names, compounds with the same name are the same
+            new_records: dict[str, Compound] = {}
+            for i, (result, failure) in enumerate(
+                zip(results, failures, strict=True), start=start
+            ):
+                if result is None:
+                    # keep the semantics of _process_smiles for invalid SMILES
+                    result = dict.fromkeys(field_names())
+                elif result["inchikey"] in existing:
+                    records.append(existing[result["inchikey"]])
+                    continue
+                record = cls(
+                    name=names[i],
+                    smiles=smiles[i],
+                    **{key: value[i] for key, value in values.items()},
+                    **result,
+                    # restandardize retries compounds without versions
+                    **(no_versions if failure in TRANSIENT_FAILURES else versions),
+                    _skip_validation=True,
+                )
+                # deduplicate within the chunk
+                record = new_records.setdefault(record.uid, record)
+                if record.inchikey is not None:
+                    existing[record.inchikey] = record
+                records.append(record)
+            existing_by_uid = {
+                record.uid: record for record in cls.filter(uid__in=new_records)
+            }
+            records[start:] = [existing_by_uid.get(r.uid, r) for r in records[start:]]
+            new_records = {
+                uid: r for uid, r in new_records.items() if uid not in existing_by_uid
+            }
+            ln.save(list(new_records.values()))
+            _compounds_written()
+            CompoundElement.update_for(new_records.values(), created=True)
+            n_created += len(new_records)
+        logger.info(
+            f"created {n_created} compounds, found {len(names) - n_created} existing"
+        )
+        return records
+
+    @classmethod
+    def filter_by_canonical_smiles(
+        cls, canonical_smiles: str | Iterable[str]
+    ) -> QuerySet:
+        """Compounds with given canonical SMILES.
+
+        Uses the index on `canonical_smiles_hash` and compares the SMILES only for
+        compounds with matching hashes.
+
+        Args:
+            canonical_smiles: One or several canonical SMILES, e.g., as returned by
+                :meth:`~pertdb.Compound.standardize_smiles`.
+
+        Example::
+
+            import pertdb
+
+            smiles = pertdb.Compound.standardize_smiles("CC(=O)[O-].[Na+]")
+            compound = pertdb.Compound.filter_by_canonical_smiles(smiles).one_or_none()
+        """
+        values = (
+            [canonical_smiles]
+            if isinstance(canonical_smiles, str)
+            else list(canonical_smiles)
+        )
+        return cls.filter(
+            canonical_smiles_hash__in={hash64(value) for value in values},
+            canonical_smiles__in=values,
+        )
+
+    @classmethod
+    def similar_to(
+        cls,
+        smiles: str,
+        threshold: float = 0.7,
+        top_k: int | None = 50,
+        n_jobs: int | None = None,
+        refresh: bool = False,
+    ) -> list[tuple[Compound, float]]:
+        """Find compounds similar to a query structure.
+
+        Compares Morgan fingerprints (radius 2, 2048 bits) of the standardized query and
+        the canonical SMILES of all compounds by Tanimoto similarity.
+        The fingerprints of the registry are computed once in worker processes and cached
+        in memory and in the lamin cache directory, later calls only fingerprint newly
+        registered compounds.
+
+        Args:
+            smiles: SMILES string of the query structure.
+            threshold: Minimal Tanimoto similarity.
+            top_k: Maximal number of returned compounds, `None` returns all hits.
+            n_jobs: Number of worker processes for building the fingerprint index.
+            refresh: Whether to rebuild the fingerprint index from scratch,
+                e.g., after canonical SMILES of existing compounds changed.
+
+        Returns:
+            Pairs of compounds and similarities, sorted by decreasing similarity.
+
+        Example::
+
+            import pertdb
+
+            hits = pertdb.Compound.similar_to("CC(=O)Oc1ccccc1C(=O)O", threshold=0.5)
+            for compound, similarity in hits:
+                print(compound.name, similarity)
+        """
+        from ._fingerprints import fingerprint_smiles, get_index
+
+        query = fingerprint_smiles([standardize_smiles(smiles)], "morgan")[0]
+        index = get_index(
+            cls.filter(canonical_smiles__isnull=False),
+            "morgan",
+            n_jobs=n_jobs,
+            refresh=refresh,
+        )
+        ids, similarities = index.tanimoto(query, threshold=threshold, top_k=top_k)
+        records = cls.objects.in_bulk(ids.tolist())
+        return [
+            (records[pk], float(similarity))
+            for pk, similarity in zip(ids.tolist(), similarities, strict=True)
+            if pk in records
+        ]
+
+    @classmethod
+    def substructure_search(
+        cls,
+        smarts: str,
+        n_jobs: int | None = None,
+        refresh: bool = False,
+    ) -> list[Compound]:
+        """Find compounds that contain a substructure.
+
+        Screens all compounds with pattern fingerprints first, which can't miss a match,
+        and only runs RDKit's substructure matching on the remaining candidates in
+        worker processes.
+        The pattern fingerprints of the registry are cached like those of
+        :meth:`~pertdb.Compound.similar_to`.
+
+        Args:
+            smarts: SMARTS pattern of the substructure, SMILES strings work, too.
+            n_jobs: Number of worker processes for fingerprinting and matching.
+            refresh: Whether to rebuild the fingerprint index from scratch.
+
+        Returns:
+            Matching compounds, ordered by id.
+
+        Example::
+
+            import pertdb
+
+            # carboxylic acids
+            compounds = pertdb.Compound.substructure_search("C(=O)[OH]")
+        """
+        from rdkit import Chem
+
+        from ._fingerprints import fingerprint_mol, get_index, match_substructure_batch
+
+        query_mol = Chem.MolFromSmarts(smarts)
+        if query_mol is None:
+            raise ValueError(f"Could not parse SMARTS: {smarts}")
+        index = get_index(
+            cls.filter(canonical_smiles__isnull=False),
+            "pattern",
+            n_jobs=n_jobs,
+            refresh=refresh,
+        )
+        candidates = cls.objects.in_bulk(
+            index.screen(fingerprint_mol(query_mol, "pattern")).tolist()
+        )
+        ids = sorted(candidates)
+        matches = match_substructure_batch(
+            [candidates[pk].canonical_smiles for pk in ids], smarts, n_jobs=n_jobs
+        )
+        logger.info(
+            f"screened {len(index.ids)} compounds, matched {sum(matches)} of "
+            f"{len(ids)} candidates"
+        )
+        return [candidates[pk] for pk, match in zip(ids, matches, strict=True) if match]
+
     @staticmethod
     def standardize_smiles(smiles: str) -> str | None:
         """Generates a standardized, canonical SMILES string from an input SMILES.
@@ -202,32 +978,85 @@ class Compound(BioRecord, HasOntologyId, TracksRun, TracksUpdates):
             The canonical, standardized SMILES string, or None if the input
             SMILES is invalid.
         """
-        # Step 1: Parse SMILES
-        mol = Chem.MolFromSmiles(smiles)
-        if mol is None:
-            raise ValueError(f"Could not parse SMILES: {smiles}")
+        return standardize_smiles(smiles)
+
+    @staticmethod
+    def standardize_smiles_batch(
+        smiles_list: Iterable[str | None],
+        n_jobs: int | None = None,
+        timeout: float | None = None,
+    ) -> list[dict[str, Any] | None]:
+        """Standardize many SMILES strings in parallel.
+
+        Runs the pipeline of :meth:`~pertdb.Compound.standardize_smiles` in worker processes
+        and computes the derived fields in the same pass.
+        SMILES that exceed the `timeout` or crash a worker process are treated like invalid
+        SMILES and the failures are logged in aggregate.
+
+        Args:
+            smiles_list: The input SMILES strings.
+            n_jobs: Number of worker processes, defaults to the number of CPUs.
+            timeout: Seconds per SMILES, defaults to `pertdb.settings.standardization_timeout`.
+
+        Returns:
+            A list in input order with one dictionary per SMILES holding
+            `canonical_smiles` and the descriptors, e.g., `inchikey` and `logp`,
+            or `None` if the SMILES is invalid, timed out or crashed.
+
+        Example::
+
+            import pertdb
+
+            results = pertdb.Compound.standardize_smiles_batch(
+                ["CC(=O)[O-].[Na+]", "CC(C)(C)O"], n_jobs=2, timeout=10
+            )
+            results[0]["canonical_smiles"]  # "CC(=O)O"
+        """
+        return standardize_batch(smiles_list, n_jobs=n_jobs, timeout=timeout)
+
 
-        # Step 2: General cleanup
-        # removeHs, disconnect metal atoms, normalize the molecule, reionize the molecule
-        clean_mol = rdMolStandardize.Cleanup(mol)
+class CompoundElement(BaseSQLRecord):
+    """Number of atoms of an element in a :class:`~pertdb.Compound`.
 
-        # Step 3: Get the parent fragment
-        parent_mol = rdMolStandardize.FragmentParent(clean_mol)
+    Parsed from `Compound.molformula` when compounds are saved, see
+    :meth:`~pertdb.Compound.filter_by_formula` for queries.
+    """
 
-        # Step 4: Neutralize
-        # Note: The Uncharger class must be instantiated.
-        uncharger = rdMolStandardize.Uncharger()
-        uncharged_mol = uncharger.uncharge(parent_mol)
+    class Meta:
+        app_label = "pertdb"
+        unique_together = ("compound", "element")
+        indexes = [models.Index(fields=["element", "count"])]
 
-        # Step 5: Generate canonical tautomer
-        # Note: The TautomerEnumerator class must be instantiated.
-        te = rdMolStandardize.TautomerEnumerator()
-        canonical_tautomer = te.Canonicalize(uncharged_mol)
+    id: int = models.BigAutoField(primary_key=True)
+    compound: Compound = ForeignKey(Compound, CASCADE, related_name="elements")
+    """The compound."""
+    element: str = CharField(max_length=3)
+    """Element symbol, e.g., `"Cl"`."""
+    count: int = IntegerField()
+    """Number of atoms of the element."""
 
-        # Step 6: Convert back to canonical SMILES string for output
-        canonical_smiles = Chem.MolToSmiles(canonical_tautomer, canonical=True)
+    @classmethod
+    def update_for(cls, compounds: Iterable[Compound], created: bool = False) -> None:
+        """Replace the element counts of saved compounds by those of their formulas.
 
-        return canonical_smiles
+        Args:
+            compounds: Saved compounds.
+            created: Whether the compounds have no element counts yet.
+        """
+        compounds = list(compounds)
+        if not created:
+            cls.objects.filter(compound__in=compounds).delete()
+        cls.objects.bulk_create(
+            [
+                cls(compound=compound, element=element, count=count)
+                for compound in compounds
+                if compound.molformula is not None
+                for element, count in parse_formula(compound.molformula).items()
+            ],
+            batch_size=10_000,
+        )
+        for compound in compounds:
+            compound._elements_stale = False
 
 
 class ArtifactCompound(BaseSQLRecord, IsLink, TracksRun):
@@ -285,6 +1114,60 @@ class PerturbationTarget(BioRecord, TracksRun, TracksUpdates):
     )
     """Artifacts linked to the perturbation target."""
 
+    @classmethod
+    def _from_gene_symbols(
+        cls, symbols: set[str], organism: str | Organism
+    ) -> dict[str, PerturbationTarget]:
+        """Get or create a target per gene symbol, linked to the gene of that symbol.
+
+        Genes are resolved with :meth:`~bionty.Gene.from_values`, genes that are
+        missing from the registry are created from the public source. Symbols that
+        don't resolve to a gene are logged and get no target.
+        """
+        import bionty as bt
+        import lamindb as ln
+
+        if not symbols:
+            return {}
+        if isinstance(organism, str):
+            organism_name = organism
+            organism = bt.Organism.filter(name=organism_name).one_or_none()
+            if organism is None:
+                organism = bt.Organism.from_source(name=organism_name).save()
+        genes = {
+            gene.symbol: gene
+            for gene in Gene.from_values(
+                sorted(symbols), field=Gene.symbol, organism=organism, mute=True
+            )
+            if gene.symbol in symbols
+        }
+        ln.save([gene for gene in genes.values() if gene._state.adding])
+        unresolved = symbols - genes.keys()
+        if unresolved:
+            logger.warning(
+                f"skipped {len(unresolved)} symbols that aren't genes of"
+                f" {organism.name}: {', '.join(sorted(unresolved)[:10])}"
+            )
+        symbols = set(genes)
+        targets = {target.name: target for target in cls.filter(name__in=symbols)}
+        new_targets = [
+            cls(name=symbol, _skip_validation=True)
+            for symbol in sorted(symbols - targets.keys())
+        ]
+        ln.save(new_targets)
+        targets.update((target.name, target) for target in new_targets)
+        link_model = cls.genes.through
+        link_model.objects.bulk_create(
+            [
+                link_model(
+                    perturbationtarget_id=targets[symbol].id, gene_id=genes[symbol].id
+                )
+                for symbol in symbols
+            ],
+            ignore_conflicts=True,
+        )
+        return targets
+
 
 class ArtifactPerturbationTarget(BaseSQLRecord, IsLink, TracksRun):
     class Meta:
@@ -311,6 +1194,10 @@ class ArtifactPerturbationTarget(BaseSQLRecord, IsLink, TracksRun):
     )
 
 
+# marks records loaded without `sequence_hash`, it's loaded on save
+_UNKNOWN_SEEDS = object()
+
+
 class GeneticPerturbation(BioRecord, TracksRun, TracksUpdates):
     """Models genetic perturbations such as CRISPR.
 
@@ -348,8 +1235,14 @@ class GeneticPerturbation(BioRecord, TracksRun, TracksUpdates):
         null=True,
     )
     """:class:`~pertdb.GeneticPerturbationSystem` used for the genetic perturbation."""
-    sequence: str | None = models.TextField(null=True, db_index=True)
+    sequence: str | None = models.TextField(null=True)
     """Sequence of the perturbation."""
+    sequence_hash: int | None = BigIntegerField(null=True, db_index=True)
+    """64-bit hash of `sequence` for equality lookups, see :meth:`~pertdb.GeneticPerturbation.filter_by_sequence`."""
+    canonical_sequence_hash: int | None = BigIntegerField(null=True, db_index=True)
+    """64-bit hash of the strand-canonical form of `sequence`, see :meth:`~pertdb.GeneticPerturbation.filter_by_canonical_sequence`."""
+    sequence_packed: bytes | None = BinaryField(null=True)
+    """`sequence` packed into 2 bits per base and a mask of ambiguous bases if `pertdb.settings.pack_sequences` is enabled, see :meth:`~pertdb.GeneticPerturbation.export_packed_sequences`."""
     on_target_score: float | None = FloatField(null=True, default=None, db_index=True)
     """On-target score, indicating the likelihood of the guide RNA successfully targeting the intended DNA sequence."""
     off_target_score: float | None = FloatField(null=True, default=None, db_index=True)
@@ -365,6 +1258,600 @@ class GeneticPerturbation(BioRecord, TracksRun, TracksUpdates):
     )
     """Artifacts linked to the perturbation."""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not args:
+            self._set_sequence_fields()
+            self._seeded_sequence_hash = None
+        else:
+            # records loaded from the database have seeds for their sequence, don't
+            # access the field as it might be deferred and cost a query per record
+            self._seeded_sequence_hash = self.__dict__.get(
+                "sequence_hash", _UNKNOWN_SEEDS
+            )
+
+    def save(self, *args, **kwargs):
+        """Override save to keep the fields computed from `sequence` and the seeds in sync."""
+        if self._seeded_sequence_hash is _UNKNOWN_SEEDS:
+            # the deferred field is loaded with the hash of the stored sequence
+            self._seeded_sequence_hash = self.sequence_hash
+        self._set_sequence_fields(
+            sequence_changed=hash64(self.sequence) != self._seeded_sequence_hash
+        )
+        super().save(*args, **kwargs)
+        if self.sequence_hash != self._seeded_sequence_hash:
+            GeneticPerturbationSeed.update_for([self])
+        return self
+
+    def _set_sequence_fields(self, sequence_changed: bool = True) -> None:
+        """Compute the fields derived from `sequence`.
+
+        A stored packed sequence is only replaced if the sequence changed, so that
+        clients without `pertdb.settings.pack_sequences` don't clear it.
+        """
+        self.sequence_hash = hash64(self.sequence)
+        if self.sequence is None:
+            self.canonical_sequence_hash = None
+            self.sequence_packed = None
+        elif sequence_changed:
+            self.canonical_sequence_hash = hash64(canonical_sequence(self.sequence))
+            self.sequence_packed = (
+                pack_sequence(self.sequence) if settings.pack_sequences else None
+            )
+        elif settings.pack_sequences and self.sequence_packed is None:
+            self.sequence_packed = pack_sequence(self.sequence)
+
+    @classmethod
+    def filter_by_sequence(cls, sequence: str | Iterable[str]) -> QuerySet:
+        """Genetic perturbations with given sequences.
+
+        Uses the index on `sequence_hash` and compares the sequences only for
+        perturbations with matching hashes.
+
+        Args:
+            sequence: One or several sequences.
+
+        Example::
+
+            import pertdb
+
+            perturbations = pertdb.GeneticPerturbation.filter_by_sequence(
+                ["AGCTGACCGTGA", "TTGGTGGTGAACT"]
+            )
+        """
+        values = [sequence] if isinstance(sequence, str) else list(sequence)
+        return cls.filter(
+            sequence_hash__in={hash64(value) for value in values},
+            sequence__in=values,
+        )
+
+    @classmethod
+    def filter_by_canonical_sequence(cls, sequence: str | Iterable[str]) -> QuerySet:
+        """Genetic perturbations with given sequences on either strand.
+
+        Sequences are compared in their strand-canonical form: uppercase, with `U`
+        replaced by `T` and the lexicographically smaller of the sequence and its
+        reverse complement.
+        Uses the index on `canonical_sequence_hash`.
+
+        Args:
+            sequence: One or several sequences.
+
+        Example::
+
+            import pertdb
+
+            # finds perturbations with sequence "GTGTCGCGCTCGATGGCTTT"
+            perturbations = pertdb.GeneticPerturbation.filter_by_canonical_sequence(
+                "aaagccaucgagcgcgacac"
+            )
+        """
+        values = [sequence] if isinstance(sequence, str) else list(sequence)
+        return cls.filter(
+            canonical_sequence_hash__in={
+                hash64(canonical_sequence(value)) for value in values
+            }
+        )
+
+    @classmethod
+    def get_or_create_by_sequence(
+        cls, sequence: str, name: str | None = None, **kwargs
+    ) -> tuple[GeneticPerturbation, bool]:
+        """Get the perturbation with a sequence on either strand or create it.
+
+        Args:
+            sequence: The sequence.
+            name: Name of a created perturbation, defaults to `sequence`.
+            **kwargs: Further fields of a created perturbation.
+
+        Returns:
+            The perturbation and whether it was created.
+            If several perturbations have the sequence, the first registered one is
+            returned.
+
+        Example::
+
+            import pertdb
+
+            guide, created = pertdb.GeneticPerturbation.get_or_create_by_sequence(
+                "AAAGCCATCGAGCGCGACAC", name="A1BG guide 1", type="CRISPR-Cas9"
+            )
+        """
+        record = cls.filter_by_canonical_sequence(sequence).order_by("id").first()
+        if record is not None:
+            return record, False
+        record = cls(
+            name=sequence if name is None else name, sequence=sequence, **kwargs
+        ).save()
+        return record, True
+
+    @classmethod
+    def search_sequence(
+        cls, sequence: str, max_mismatches: int = 3
+    ) -> list[tuple[GeneticPerturbation, int]]:
+        """Find perturbations whose sequences have few mismatches to a query sequence.
+
+        Looks up candidates that share a seed of 5 bases at the same offset with the
+        query in the index of :class:`~pertdb.GeneticPerturbationSeed`, and counts
+        the mismatches of the candidates on 2-bit encoded sequences.
+        Only sequences of the same length as the query are compared, RNA and DNA bases
+        are considered equal and ambiguous bases like `N` are mismatches.
+        If the query has too few seeds for `max_mismatches`, all sequences of its length
+        are compared.
+
+        Args:
+            sequence: The query sequence.
+            max_mismatches: Maximal number of mismatches.
+
+        Returns:
+            Pairs of perturbations and numbers of mismatches, sorted by mismatches.
+
+        Example::
+
+            import pertdb
+
+            hits = pertdb.GeneticPerturbation.search_sequence(
+                "AAAGCCATCGAGCGCGACAC", max_mismatches=2
+            )
+            for perturbation, mismatches in hits:
+                print(perturbation.name, mismatches)
+        """
+        from django.db.models.functions import Length
+
+        from ._sequences import encode_2bit, hamming, sequence_seeds
+
+        query = normalize_sequence(sequence)
+        seeds = sequence_seeds(query)
+        if len(seeds) > max_mismatches:
+            # any max_mismatches + 1 seeds contain one without mismatches
+            condition = models.Q()
+            for offset, kmer in seeds[: max_mismatches + 1]:
+                condition |= models.Q(offset=offset, kmer=kmer)
+            candidates = cls.filter(
+                id__in=GeneticPerturbationSeed.objects.filter(condition).values(
+                    "perturbation_id"
+                )
+            )
+        else:
+            candidates = cls.filter(sequence__isnull=False)
+        rows = list(
+            candidates.annotate(length=Length("sequence"))
+            .filter(length=len(query))
+            .values_list("id", "sequence")
+        )
+        if not rows:
+            return []
+        packed, mask = encode_2bit([row[1] for row in rows], len(query))
+        query_packed, query_mask = encode_2bit([query], len(query))
+        mismatches = hamming(packed, mask, query_packed[0], query_mask[0])
+        hits = np.flatnonzero(mismatches <= max_mismatches)
+        hits = hits[np.argsort(mismatches[hits], kind="stable")]
+        ids = [rows[i][0] for i in hits]
+        records = cls.objects.in_bulk(ids)
+        return [
+            (records[pk], int(mismatches[i])) for pk, i in zip(ids, hits, strict=True)
+        ]
+
+    @classmethod
+    def backfill_seeds(cls, chunk_size: int = 10_000) -> int:
+        """Populate the seeds of perturbations that have a sequence but no seeds.
+
+        :meth:`~pertdb.GeneticPerturbation.search_sequence` only finds perturbations
+        with seeds, run this once after upgrading an instance with existing guides.
+
+        Args:
+            chunk_size: Number of perturbations processed at once.
+
+        Returns:
+            The number of processed perturbations.
+        """
+        queryset = cls.filter(sequence__isnull=False, seeds__isnull=True).only(
+            "id", "sequence"
+        )
+        n_updated = 0
+        for chunk in _iter_id_chunks(queryset, chunk_size):
+            GeneticPerturbationSeed.update_for(chunk, created=True)
+            n_updated += len(chunk)
+        logger.info(f"computed seeds of {n_updated} genetic perturbations")
+        return n_updated
+
+    @classmethod
+    def backfill_packed_sequences(cls, chunk_size: int = 10_000) -> int:
+        """Populate `sequence_packed` of perturbations that have a sequence.
+
+        Run this when enabling `pertdb.settings.pack_sequences` on an instance with
+        existing perturbations, so that
+        :meth:`~pertdb.GeneticPerturbation.export_packed_sequences` reads stored
+        bytes instead of encoding sequences.
+
+        Args:
+            chunk_size: Number of perturbations updated at once.
+
+        Returns:
+            The number of updated perturbations.
+        """
+        queryset = cls.filter(
+            sequence__isnull=False, sequence_packed__isnull=True
+        ).only("id", "sequence")
+        n_updated = 0
+        for chunk in _iter_id_chunks(queryset, chunk_size):
+            for record in chunk:
+                record.sequence_packed = pack_sequence(record.sequence)
+            cls.objects.bulk_update(chunk, ["sequence_packed"])
+            n_updated += len(chunk)
+        logger.info(f"packed the sequences of {n_updated} genetic perturbations")
+        return n_updated
+
+    @classmethod
+    def export_packed_sequences(
+        cls, queryset: QuerySet | None = None, length: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Export sequences of equal length as 2-bit packed matrices.
+
+        Each row packs the bases of one sequence, 4 bases per byte from the most
+        significant bits with `A=0`, `C=1`, `G=2` and `T=3`.
+        The mask has the lower bit of a base set for ambiguous bases like `N`.
+        Both matrices are views into the buffer of the packed sequences as fetched
+        from the database and take a quarter of the memory of one byte per base.
+        Sequences that aren't packed in the database, see
+        :meth:`~pertdb.GeneticPerturbation.backfill_packed_sequences`, are packed
+        on the fly.
+
+        Args:
+            queryset: Perturbations to export, all perturbations by default.
+                Perturbations without sequence are skipped.
+            length: Export only sequences of this length, required if the sequences
+                have different lengths.
+
+        Returns:
+            Perturbation ids, packed bases and mask of shape
+            `(n_perturbations, ceil(length / 4))`, ordered by id.
+
+        Example::
+
+            import pertdb
+
+            ids, packed, mask = pertdb.GeneticPerturbation.export_packed_sequences(
+                pertdb.GeneticPerturbation.filter(type="CRISPR-Cas9"), length=20
+            )
+        """
+        from django.db.models.functions import Length
+
+        from ._sequences import stack_packed
+
+        if queryset is None:
+            queryset = cls.filter()
+        queryset = queryset.filter(sequence__isnull=False).annotate(
+            length=Length("sequence")
+        )
+        if length is None:
+            lengths = sorted(
+                queryset.order_by().values_list("length", flat=True).distinct()
+            )
+            if len(lengths) > 1:
+                raise ValueError(
+                    f"sequences have lengths {lengths}, pass `length` to export "
+                    "sequences of one length"
+                )
+            length = lengths[0] if lengths else 0
+        rows = (
+            queryset.filter(length=length)
+            .annotate(
+                # only fetch the text of sequences that aren't packed
+                unpacked=models.Case(
+                    models.When(sequence_packed__isnull=True, then="sequence")
+                )
+            )
+            .order_by("id")
+            .values_list("id", "sequence_packed", "unpacked")
+        )
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        blobs = [pack_sequence(s) if blob is None else blob for _, blob, s in rows]
+        packed, mask = stack_packed(blobs, length)
+        return ids, packed, mask
+
+    @classmethod
+    def score_off_targets(
+        cls,
+        fasta: str | Path,
+        queryset: QuerySet | None = None,
+        max_mismatches: int = 3,
+        n_jobs: int | None = None,
+        chunk_size: int = 10_000,
+    ) -> int:
+        """Compute the off-target scores of guides against a local reference genome.
+
+        Searches both strands of all sequences of a FASTA file for protospacers with
+        an `NGG` PAM that have at most `max_mismatches` mismatches to a guide, using
+        a seed index of the guides. Sites are scored in vectorized form with the
+        position-specific mismatch penalties of Hsu et al. (2013), a perfect match
+        scores 1.
+        With `s` the summed score of all sites except the on-target site, the
+        `off_target_score` is `100 * s / (1 + s)`: 0 for guides without off-target
+        sites, 50 for a guide with two perfect sites.
+
+        The FASTA file must be uncompressed and indexed with `samtools faidx`.
+        It's memory-mapped and its sequences are scored in parallel worker processes.
+        Only 20-mer guides are scored.
+
+        Args:
+            fasta: Path of the reference genome, e.g., `GRCh38.fa` with index
+                `GRCh38.fa.fai`.
+            queryset: Guides to score, all genetic perturbations with 20-mer
+                sequences by default.
+            max_mismatches: Maximal number of mismatches of off-target sites.
+            n_jobs: Number of worker processes.
+            chunk_size: Number of guides updated at once.
+
+        Returns:
+            The number of scored guides.
+
+        Example::
+
+            import pertdb
+
+            pertdb.GeneticPerturbation.score_off_targets(
+                "GRCh38.fa", pertdb.GeneticPerturbation.filter(type="CRISPR-Cas9")
+            )
+        """
+        from django.db.models.functions import Length
+
+        from ._offtargets import GUIDE_LENGTH, score_guides
+
+        if queryset is None:
+            queryset = cls.filter()
+        guides = list(
+            queryset.filter(sequence__isnull=False)
+            .annotate(length=Length("sequence"))
+            .filter(length=GUIDE_LENGTH)
+            .order_by("id")
+            .only("id", "sequence")
+        )
+        if not guides:
+            return 0
+        scores = score_guides(
+            fasta,
+            [guide.sequence for guide in guides],
+            max_mismatches=max_mismatches,
+            n_jobs=n_jobs,
+        )
+        for guide, score in zip(guides, scores.tolist(), strict=True):
+            guide.off_target_score = score
+        cls.objects.bulk_update(guides, ["off_target_score"], batch_size=chunk_size)
+        logger.info(f"scored off-targets of {len(guides)} guides")
+        return len(guides)
+
+    @classmethod
+    def from_guides_bulk(
+        cls,
+        sequences: Iterable[str],
+        genes: Iterable[str | None],
+        type: GeneticPerturbationSystem = "CRISPR-Cas9",
+        on_target_scores: Iterable[float | None] | None = None,
+        off_target_scores: Iterable[float | None] | None = None,
+        names: Iterable[str] | None = None,
+        organism: str | Organism = "human",
+        chunk_size: int = 10_000,
+    ) -> list[GeneticPerturbation]:
+        """Create the guides of a library in bulk and link them to their target genes.
+
+        Target genes are resolved by symbol with :meth:`~bionty.Gene.from_values`,
+        genes missing from the registry are created from the public source and
+        symbols that don't resolve are logged, their guides are saved without
+        targets. Each gene gets a :class:`~pertdb.PerturbationTarget` named by
+        its symbol. Guides are bulk-created chunk by chunk together with their links
+        to targets.
+        Guides are deduplicated by their strand-canonical sequence, see
+        :meth:`~pertdb.GeneticPerturbation.filter_by_canonical_sequence`, with one
+        indexed query per chunk: a guide with the sequence of an existing guide on
+        either strand resolves to the existing guide.
+        As uids are derived from names, so does a guide named like an existing guide.
+
+        Args:
+            sequences: Guide sequences.
+            genes: Symbols of the target genes, `None` for non-targeting guides.
+            type: The :class:`~pertdb.GeneticPerturbationSystem` of the library.
+            on_target_scores: On-target scores of the guides.
+            off_target_scores: Off-target scores of the guides.
+            names: Names of the guides, defaults to `"{gene}_{sequence}"`.
+            organism: Organism of the target genes.
+            chunk_size: Number of guides saved at once.
+
+        Returns:
+            Existing and newly created guides in input order.
+
+        Example::
+
+            import pertdb
+
+            guides = pertdb.GeneticPerturbation.from_guides_bulk(
+                sequences=["AAAGCCATCGAGCGCGACAC", "GCTTCGTCAAGGAGCCCCAA"],
+                genes=["A1BG", "A1BG"],
+                on_target_scores=[0.62, 0.55],
+            )
+        """
+        import lamindb as ln
+
+        sequences = list(sequences)
+        genes = list(genes)
+        if len(genes) != len(sequences):
+            raise ValueError(f"got {len(genes)} genes but {len(sequences)} sequences")
+        if names is None:
+            names = [
+                s if gene is None else f"{gene}_{s}"
+                for gene, s in zip(genes, sequences, strict=True)
+            ]
+        values = {
+            "names": list(names),
+            "genes": genes,
+            "on_target_scores": [None] * len(sequences)
+            if on_target_scores is None
+            else list(on_target_scores),
+            "off_target_scores": [None] * len(sequences)
+            if off_target_scores is None
+            else list(off_target_scores),
+        }
+        for key, value in values.items():
+            if len(value) != len(sequences):
+                raise ValueError(
+                    f"got {len(value)} {key} but {len(sequences)} sequences"
+                )
+        targets = PerturbationTarget._from_gene_symbols(
+            {gene for gene in genes if gene is not None}, organism
+        )
+        link_model = cls.targets.through
+        records: list[GeneticPerturbation] = []
+        n_created = 0
+        for start in range(0, len(sequences), chunk_size):
+            new_records: dict[str, GeneticPerturbation] = {}
+            records_by_key: dict[int, GeneticPerturbation] = {}
+            record_genes: dict[str, str | None] = {}
+            for i in range(start, min(start + chunk_size, len(sequences))):
+                record = cls(
+                    name=values["names"][i],
+                    type=type,
+                    sequence=sequences[i],
+                    on_target_score=values["on_target_scores"][i],
+                    off_target_score=values["off_target_scores"][i],
+                    _skip_validation=True,
+                )
+                # deduplicate within the chunk
+                key = record.canonical_sequence_hash
+                if key in records_by_key:
+                    record = records_by_key[key]
+                else:
+                    record = new_records.setdefault(record.uid, record)
+                    if key is not None:
+                        records_by_key[key] = record
+                record_genes.setdefault(record.uid, genes[i])
+                records.append(record)
+            existing_by_uid: dict[str, GeneticPerturbation] = {}
+            existing_by_key: dict[int, GeneticPerturbation] = {}
+            for record in cls.filter(
+                models.Q(uid__in=new_records)
+                | models.Q(canonical_sequence_hash__in=records_by_key)
+            ).order_by("id"):
+                existing_by_uid[record.uid] = record
+                existing_by_key.setdefault(record.canonical_sequence_hash, record)
+            resolved = {
+                uid: existing_by_uid[uid]
+                if uid in existing_by_uid
+                else existing_by_key.get(record.canonical_sequence_hash, record)
+                for uid, record in new_records.items()
+            }
+            records[start:] = [resolved[r.uid] for r in records[start:]]
+            new_records = {
+                uid: r for uid, r in new_records.items() if resolved[uid] is r
+            }
+            ln.save(list(new_records.values()))
+            GeneticPerturbationSeed.update_for(new_records.values(), created=True)
+            link_model.objects.bulk_create(
+                [
+                    link_model(
+                        geneticperturbation_id=record.id,
+                        perturbationtarget_id=targets[record_genes[uid]].id,
+                    )
+                    for uid, record in new_records.items()
+                    if record_genes[uid] in targets
+                ],
+                ignore_conflicts=True,
+            )
+            n_created += len(new_records)
+        logger.info(
+            f"created {n_created} genetic perturbations, found"
+            f" {len(sequences) - n_created} existing"
+        )
+        return records
+
+
+class GeneticPerturbationSeed(BaseSQLRecord):
+    """Seed of the sequence of a :class:`~pertdb.GeneticPerturbation`.
+
+    Seeds are the non-overlapping k-mers of a sequence at fixed offsets, maintained
+    when perturbations are saved, see
+    :meth:`~pertdb.GeneticPerturbation.search_sequence` for queries.
+    """
+
+    class Meta:
+        app_label = "pertdb"
+        indexes = [models.Index(fields=["kmer", "offset"])]
+
+    id: int = models.BigAutoField(primary_key=True)
+    perturbation: GeneticPerturbation = ForeignKey(
+        GeneticPerturbation, CASCADE, related_name="seeds"
+    )
+    """The perturbation."""
+    offset: int = IntegerField()
+    """Position of the first base of the seed in the sequence."""
+    kmer: int = IntegerField()
+    """The bases of the seed, 2 bits per base."""
+
+    @classmethod
+    def update_for(
+        cls, perturbations: Iterable[GeneticPerturbation], created: bool = False
+    ) -> None:
+        """Replace the seeds of saved perturbations by those of their sequences.
+
+        Args:
+            perturbations: Saved perturbations.
+            created: Whether the perturbations have no seeds yet.
+        """
+        from ._sequences import sequence_seeds
+
+        perturbations = list(perturbations)
+        if not created:
+            cls.objects.filter(perturbation__in=perturbations).delete()
+        cls.objects.bulk_create(
+            [
+                cls(perturbation=perturbation, offset=offset, kmer=kmer)
+                for perturbation in perturbations
+                if perturbation.sequence is not None
+                for offset, kmer in sequence_seeds(perturbation.sequence)
+            ],
+            batch_size=10_000,
+        )
+        for perturbation in perturbations:
+            perturbation._seeded_sequence_hash = perturbation.sequence_hash
+
+
+class BulkLoadIndex(BaseSQLRecord):
+    """Definition of an index dropped by :func:`~pertdb.bulk_load`.
+
+    Stored in the database so that any client of the instance can rebuild the
+    indexes of an interrupted bulk load with :func:`~pertdb.restore_indexes`.
+    """
+
+    class Meta:
+        app_label = "pertdb"
+
+    id: int = models.BigAutoField(primary_key=True)
+    name: str = CharField(max_length=255, unique=True)
+    """Name of the index."""
+    table: str = CharField(max_length=255)
+    """Table of the index."""
+    sql: str = TextField()
+    """SQL statement that creates the index."""
+
 
 class ArtifactGeneticPerturbation(BaseSQLRecord, IsLink, TracksRun):
     class Meta:
@@ -0,0 +1,80 @@
+import time
+
+import lamindb as ln
+import pertdb
+from pertdb._bulk_load import _drop_indexes, lookup_indexes, secondary_indexes
+from pertdb.models import BulkLoadIndex
+
+
+def _compounds(n: int, prefix: str) -> list[pertdb.Compound]:
+    return [
+        pertdb.Compound(
+            name=f"{prefix} {i}",
+            chembl_id=f"{prefix[:4].upper()}{i}",
+            inchikey=f"{prefix}-{i:08d}",
+            molweight=float(i),
+            molformula=f"C{i}",
+            moa="benchmark",
+            _skip_validation=True,
+        )
+        for i in range(n)
+    ]
+
+
+def test_bulk_load_benchmark():
+    indexes = secondary_indexes()
+    compound_indexes = [i for i in indexes if i["table"] == "wetlab_compound"]
+    n = 5_000
+
+    start = time.perf_counter()
+    ln.save(_compounds(n, "indexed"))
+    indexed_time = time.perf_counter() - start
+
+    with pertdb.bulk_load(keep=["wetlab_compound_moa_95b0340e"]) as dropped:
+        kept = secondary_indexes()
+        assert sorted(dropped + kept, key=lambda index: index["name"]) == indexes
+        # indexes queried by bulk creation methods & explicitly kept indexes remain
+        assert {index["name"] for index in kept} == {
+            "wetlab_compound_moa_95b0340e",
+            "wetlab_compound_inchikey_3a230733",
+            "wetlab_compound_canonical_smiles_hash_a698d0f5",
+            "wetlab_geneticperturbation_sequence_hash_e55d8ded",
+            "wetlab_geneticperturbation_canonical_sequence_hash_6dbf5b22",
+            "pertdb_gene_kmer_095f33_idx",
+            "pertdb_geneticperturbationseed_perturbation_id_01f5ba09",
+            "wetlab_perturbationtarget_name_f3a0243b",
+        }
+        assert len(kept) == len(lookup_indexes()) + 1
+        assert BulkLoadIndex.objects.count() == len(dropped)
+        start = time.perf_counter()
+        ln.save(_compounds(n, "deferred"))
+        deferred_time = time.perf_counter() - start
+        start = time.perf_counter()
+    rebuild_time = time.perf_counter() - start
+
+    assert secondary_indexes() == indexes
+    assert not BulkLoadIndex.objects.exists()
+    n_kept = len([i for i in kept if i["table"] == "wetlab_compound"])
+    print(
+        f"\nindexes updated per inserted compound: {len(compound_indexes)} vs {n_kept}"
+    )
+    print(f"inserting {n} compounds with indexes: {indexed_time:.3f}s")
+    print(
+        f"inserting {n} compounds in bulk_load: {deferred_time:.3f}s "
+        f"+ {rebuild_time:.3f}s to rebuild indexes"
+    )
+    assert pertdb.Compound.filter(inchikey="deferred-00000042").one().molweight == 42
+
+    pertdb.Compound.filter(moa="benchmark").delete(permanent=True)
+
+
+def test_restore_indexes_after_interruption():
+    indexes = secondary_indexes()
+    # drop the indexes as if a bulk load was interrupted
+    dropped = _drop_indexes()
+    assert len(secondary_indexes()) == len(indexes) - len(dropped)
+    # the journal is in the database, not on the machine that dropped the indexes
+    assert BulkLoadIndex.objects.count() == len(dropped)
+    assert pertdb.restore_indexes() == len(dropped)
+    assert secondary_indexes() == indexes
+    assert pertdb.restore_indexes() == 0
@@ -0,0 +1,40 @@
+import pertdb
+from pertdb._sequences import canonical_sequence
+
+
+def test_canonical_sequence():
+    assert canonical_sequence("GTGTCGCGCTCGATGGCTTT") == "AAAGCCATCGAGCGCGACAC"
+    assert canonical_sequence("aaagccaucgagcgcgacac") == "AAAGCCATCGAGCGCGACAC"
+    assert canonical_sequence("GGCN") == "GGCN"
+
+
+def test_deduplicate_guides_across_strands():
+    guide, created = pertdb.GeneticPerturbation.get_or_create_by_sequence(
+        "TCCAGGACTTGCTGAAGCAG", name="strand test guide"
+    )
+    assert created
+    reverse_complement = "CTGCTTCAGCAAGTCCTGGA"
+    same, created = pertdb.GeneticPerturbation.get_or_create_by_sequence(
+        reverse_complement.lower()
+    )
+    assert not created
+    assert same == guide
+    assert (
+        pertdb.GeneticPerturbation.filter_by_canonical_sequence(
+            reverse_complement.replace("T", "U")
+        ).one()
+        == guide
+    )
+
+    guides = pertdb.GeneticPerturbation.from_guides_bulk(
+        sequences=[
+            reverse_complement,
+            "GATCCAGTTACGGCATTCAG",
+            "ctgaatgccgtaactggatc",
+        ],
+        genes=[None, None, None],
+    )
+    assert guides[0] == guide
+    assert guides[1] is guides[2]
+    assert guides[1].name == "GATCCAGTTACGGCATTCAG"
+    assert not pertdb.GeneticPerturbation.filter(name="ctgaatgccgtaactggatc").exists()
@@ -0,0 +1,58 @@
+import pertdb
+import pytest
+
+
+def test_from_smiles_bulk():
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping SMILES normalization tests.")
+
+    existing = pertdb.Compound(name="Bulk ethanol", smiles="CCO").save()
+    names = ["Sodium propionate", "Propionic acid", "Ethanol", "Invalid"]
+    smiles = ["CCC(=O)[O-].[Na+]", "CCC(=O)O", "OCC", "not a smiles"]
+    compounds = pertdb.Compound.from_smiles_bulk(
+        names, smiles, chunk_size=2, n_jobs=1, chembl_id=["CHEMBL1", None, None, None]
+    )
+
+    assert [c.name for c in compounds] == [
+        "Sodium propionate",
+        "Sodium propionate",
+        "Bulk ethanol",
+        "Invalid",
+    ]
+    assert compounds[0] is compounds[1]
+    assert compounds[0].pk is not None
+    assert compounds[0].canonical_smiles == "CCC(=O)O"
+    assert compounds[0].chembl_id == "CHEMBL1"
+    assert compounds[2] == existing
+    assert compounds[3].pk is not None and compounds[3].canonical_smiles is None
+
+    # a second import only finds existing records
+    again = pertdb.Compound.from_smiles_bulk(names[:3], smiles[:3], n_jobs=1)
+    assert [c.pk for c in again] == [c.pk for c in compounds[:3]]
+
+    for compound in {c.pk: c for c in compounds}.values():
+        compound.delete(permanent=True)
+
+
+def test_restandardize():
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping SMILES normalization tests.")
+
+    current = pertdb.Compound(name="Current pentanol", smiles="CCCCCO").save()
+    stale = pertdb.Compound(name="Stale hexanol", smiles="CCCCCCO").save()
+    assert current.standardizer_version is not None
+    assert current.rdkit_version is not None
+    # simulate a compound standardized by an older RDKit
+    pertdb.Compound.objects.filter(pk=stale.pk).update(
+        rdkit_version="2020.03.1", canonical_smiles="outdated"
+    )
+
+    assert pertdb.Compound.restandardize(chunk_size=1, n_jobs=1) >= 1
+    stale.refresh_from_db()
+    assert stale.canonical_smiles == "CCCCCCO"
+    assert stale.rdkit_version == current.rdkit_version
+    # nothing left to do
+    assert pertdb.Compound.restandardize(n_jobs=1) == 0
+
+    current.delete(permanent=True)
+    stale.delete(permanent=True)
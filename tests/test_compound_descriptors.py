@@ -0,0 +1,51 @@
+import pertdb
+import pytest
+from pertdb._standardize import DESCRIPTORS
+
+
+def test_descriptors_and_filters():
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping SMILES normalization tests.")
+
+    caffeine, diazepam, tetracontane = pertdb.Compound.from_smiles_bulk(
+        names=["Caffeine", "Diazepam", "Tetracontane"],
+        smiles=[
+            "Cn1cnc2c1c(=O)n(C)c(=O)n2C",
+            "CN1C(=O)CN=C(c2ccccc2)c2cc(Cl)ccc21",
+            "C" * 40,
+        ],
+    )
+    assert caffeine.hbd == 0
+    assert caffeine.hba == 6
+    assert caffeine.heavy_atoms == 14
+    assert caffeine.rotatable_bonds == 0
+    assert round(caffeine.tpsa, 2) == 61.82
+    assert round(caffeine.logp, 2) == -1.03
+
+    ids = {caffeine.id, diazepam.id, tetracontane.id}
+    lipinski = set(pertdb.Compound.filter_lipinski().filter(id__in=ids))
+    assert lipinski == {caffeine, diazepam}
+    # tetracontane violates the molecular weight and logP criteria
+    assert tetracontane not in pertdb.Compound.filter_lipinski(max_violations=1)
+    assert tetracontane in pertdb.Compound.filter_lipinski(max_violations=2)
+    assert set(pertdb.Compound.filter_lead_like().filter(id__in=ids)) == {diazepam}
+
+    pertdb.Compound.filter(id__in=ids).update(**dict.fromkeys(DESCRIPTORS))
+    assert pertdb.Compound.backfill_descriptors(n_jobs=1) == 3
+    caffeine.refresh_from_db()
+    assert caffeine.hba == 6
+    assert caffeine.inchikey == "RYYVLZVUVIJVGH-UHFFFAOYSA-N"
+
+    # existing values are kept
+    pertdb.Compound.filter(id=caffeine.id).update(logp=None, hba=99)
+    pertdb.Compound.backfill_descriptors(n_jobs=1)
+    caffeine.refresh_from_db()
+    assert round(caffeine.logp, 2) == -1.03
+    assert caffeine.hba == 99
+    # compounds whose descriptors can't be computed are left unchanged
+    pertdb.Compound.filter(id=caffeine.id).update(canonical_smiles="C1CC", logp=None)
+    pertdb.Compound.backfill_descriptors(n_jobs=1)
+    caffeine.refresh_from_db()
+    assert caffeine.inchikey == "RYYVLZVUVIJVGH-UHFFFAOYSA-N"
+    assert caffeine.molformula == "C8H10N4O2"
+    pertdb.Compound.filter(id__in=ids).delete(permanent=True)
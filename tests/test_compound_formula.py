@@ -0,0 +1,68 @@
+import pertdb
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from pertdb._formula import parse_formula
+
+
+def test_parse_formula():
+    assert parse_formula("C8H10N4O2") == {"C": 8, "H": 10, "N": 4, "O": 2}
+    assert parse_formula("C2H3O2-") == {"C": 2, "H": 3, "O": 2}
+    assert parse_formula("CH2Cl2") == {"C": 1, "H": 2, "Cl": 2}
+
+
+def test_filter_by_formula():
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping SMILES normalization tests.")
+
+    chloroform = pertdb.Compound(name="Chloroform", smiles="ClC(Cl)Cl").save()
+    eicosane, triethyltin, decane = pertdb.Compound.from_smiles_bulk(
+        names=["Chloroeicosane", "Triethyltin chloride", "Decane"],
+        smiles=["C" * 20 + "Cl", "CC[Sn](CC)(CC)Cl", "C" * 10],
+    )
+    assert {e.element: e.count for e in chloroform.elements.all()} == {
+        "C": 1,
+        "H": 1,
+        "Cl": 3,
+    }
+    ids = [chloroform.id, eicosane.id, triethyltin.id, decane.id]
+    compounds = pertdb.Compound.filter(id__in=ids)
+
+    chlorinated = pertdb.Compound.filter_by_formula({"Cl": (1, None)}).filter(
+        id__in=ids
+    )
+    assert set(chlorinated) == {chloroform, eicosane, triethyltin}
+    large = pertdb.Compound.filter_by_formula({"Cl": (1, None), "C": (20, None)})
+    assert set(large.filter(id__in=ids)) == {eicosane}
+    no_metals = pertdb.Compound.filter_by_formula(metals=False).filter(id__in=ids)
+    assert triethyltin not in no_metals
+    assert set(compounds) - set(no_metals) == {triethyltin}
+    at_most_one_chlorine = pertdb.Compound.filter_by_formula({"Cl": (None, 1)})
+    assert set(at_most_one_chlorine.filter(id__in=ids)) == {
+        eicosane,
+        triethyltin,
+        decane,
+    }
+    assert set(
+        pertdb.Compound.filter_by_formula({"C": 10}, exclude=["Cl"]).filter(id__in=ids)
+    ) == {decane}
+
+    # counts follow changes of the SMILES
+    chloroform.update_smiles("ClCCl")
+    assert chloroform.elements.get(element="Cl").count == 2
+    pertdb.CompoundElement.filter(compound_id__in=ids).delete()
+    assert pertdb.Compound.backfill_elements() >= 4
+    assert decane.elements.get(element="C").count == 10
+    # counts of formulas computed by the descriptor backfill
+    pertdb.Compound.filter(id=decane.id).update(molformula=None)
+    pertdb.CompoundElement.filter(compound_id=decane.id).delete()
+    pertdb.Compound.backfill_descriptors(n_jobs=1)
+    assert decane.elements.get(element="H").count == 22
+
+    # new compounds don't delete element counts
+    with CaptureQueriesContext(connection) as queries:
+        ethanol = pertdb.Compound(name="Formula ethanol", smiles="CCO").save()
+    assert not any(q["sql"].startswith("DELETE") for q in queries.captured_queries)
+    assert ethanol.elements.get(element="O").count == 1
+    ethanol.delete(permanent=True)
+    compounds.delete(permanent=True)
@@ -0,0 +1,62 @@
+import pertdb
+import pytest
+
+
+def test_scaffolds():
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping SMILES normalization tests.")
+
+    benzylpyridine, methylbenzylpyridine, diphenylmethane, dodecane = (
+        pertdb.Compound.from_smiles_bulk(
+            names=[
+                "4-Benzylpyridine",
+                "4-(4-Methylbenzyl)pyridine",
+                "Diphenylmethane",
+                "Dodecane",
+            ],
+            smiles=[
+                "c1ccc(cc1)Cc1ccncc1",
+                "Cc1ccc(cc1)Cc1ccncc1",
+                "c1ccc(cc1)Cc1ccccc1",
+                "C" * 12,
+            ],
+        )
+    )
+    assert benzylpyridine.murcko_scaffold == "c1ccc(Cc2ccncc2)cc1"
+    assert benzylpyridine.generic_scaffold == "C1CCC(CC2CCCCC2)CC1"
+    assert dodecane.murcko_scaffold == ""
+
+    same_scaffold = pertdb.Compound.filter_by_scaffold("Clc1ccc(cc1)Cc1ccncc1")
+    assert set(same_scaffold) == {benzylpyridine, methylbenzylpyridine}
+    same_generic_scaffold = pertdb.Compound.filter_by_scaffold(
+        "c1ccc(cc1)Cc1ccncc1", generic=True
+    )
+    assert diphenylmethane in same_generic_scaffold
+    with pytest.raises(ValueError, match="invalid SMILES"):
+        pertdb.Compound.filter_by_scaffold("not a smiles")
+
+    ids = [benzylpyridine.id, methylbenzylpyridine.id, diphenylmethane.id]
+    # acyclic compounds have no scaffold to count
+    ids.append(dodecane.id)
+    counts = pertdb.Compound.scaffold_counts(pertdb.Compound.filter(id__in=ids))
+    assert list(counts) == [
+        {"scaffold": "c1ccc(Cc2ccncc2)cc1", "n_compounds": 2},
+        {"scaffold": "c1ccc(Cc2ccccc2)cc1", "n_compounds": 1},
+    ]
+    generic_counts = pertdb.Compound.scaffold_counts(
+        pertdb.Compound.filter(id__in=ids), generic=True
+    )
+    assert list(generic_counts) == [
+        {"scaffold": "C1CCC(CC2CCCCC2)CC1", "n_compounds": 3}
+    ]
+
+    # scaffolds of compounds registered before they were introduced
+    pertdb.Compound.filter(id__in=ids).update(
+        murcko_scaffold=None, murcko_scaffold_hash=None
+    )
+    pertdb.Compound.backfill_descriptors(n_jobs=1)
+    assert set(pertdb.Compound.filter_by_scaffold("c1ccc(cc1)Cc1ccncc1")) == {
+        benzylpyridine,
+        methylbenzylpyridine,
+    }
+    pertdb.Compound.filter(id__in=ids).delete(permanent=True)
@@ -0,0 +1,84 @@
+import pertdb
+import pytest
+
+
+@pytest.fixture(scope="module")
+def compounds():
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping compound search tests.")
+    records = pertdb.Compound.from_smiles_bulk(
+        ["Aspirin", "Salicylic acid", "Benzene", "Hexane"],
+        ["CC(=O)Oc1ccccc1C(=O)O", "O=C(O)c1ccccc1O", "c1ccccc1", "CCCCCC"],
+        n_jobs=1,
+    )
+    yield records
+    for record in records:
+        record.delete(permanent=True)
+
+
+def test_similar_to(compounds):
+    hits = pertdb.Compound.similar_to("CC(=O)Oc1ccccc1C(=O)O", threshold=0.3)
+    assert hits[0] == (compounds[0], 1.0)
+    assert compounds[1] in [compound for compound, _ in hits]
+    assert compounds[3] not in [compound for compound, _ in hits]
+    similarities = [similarity for _, similarity in hits]
+    assert similarities == sorted(similarities, reverse=True)
+
+    assert len(pertdb.Compound.similar_to("c1ccccc1", threshold=0.0, top_k=2)) == 2
+
+    # newly registered compounds are appended to the cached index
+    toluene = pertdb.Compound(name="Toluene", smiles="Cc1ccccc1").save()
+    hits = pertdb.Compound.similar_to("Cc1ccccc1", threshold=0.99)
+    assert [compound for compound, _ in hits] == [toluene]
+    toluene.delete(permanent=True)
+
+
+def test_substructure_search(compounds):
+    acids = pertdb.Compound.substructure_search("C(=O)[OH]")
+    assert compounds[0] in acids and compounds[1] in acids
+    assert compounds[2] not in acids and compounds[3] not in acids
+
+    aromatics = pertdb.Compound.substructure_search("c1ccccc1")
+    assert set(compounds[:3]) <= set(aromatics)
+    assert compounds[3] not in aromatics
+
+    with pytest.raises(ValueError):
+        pertdb.Compound.substructure_search("not a smarts")
+
+
+def test_index_follows_restandardization(compounds):
+    compound = pertdb.Compound(
+        name="Restandardized dimethylcyclohexane", smiles="CC1CCCCC1C"
+    ).save()
+    hits = pertdb.Compound.similar_to("CC1CCCCC1C", threshold=0.99)
+    assert compound in [hit for hit, _ in hits]
+    # bulk updates don't change `updated_at`
+    pertdb.Compound.objects.filter(pk=compound.pk).update(
+        smiles="Nc1ccccc1", rdkit_version="2020.03.1"
+    )
+    assert pertdb.Compound.restandardize(n_jobs=1) >= 1
+
+    hits = pertdb.Compound.similar_to("CC1CCCCC1C", threshold=0.99)
+    assert compound not in [hit for hit, _ in hits]
+    hits = pertdb.Compound.similar_to("Nc1ccccc1", threshold=0.99)
+    assert compound in [hit for hit, _ in hits]
+    assert compound in pertdb.Compound.substructure_search("c1ccccc1N")
+    compound.delete(permanent=True)
+
+
+def test_index_state_is_checked_once_per_ttl(compounds, monkeypatch):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def n_aggregates():
+        with CaptureQueriesContext(connection) as context:
+            pertdb.Compound.similar_to("c1ccccc1", threshold=0.5)
+        return sum("COUNT(" in q["sql"] for q in context.captured_queries)
+
+    n_aggregates()
+    assert n_aggregates() == 0
+    # writes of this process trigger a check
+    compounds[3].save()
+    assert n_aggregates() == 1
+    monkeypatch.setattr(pertdb.settings, "fingerprint_index_ttl", 0)
+    assert n_aggregates() == 1
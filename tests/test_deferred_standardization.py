@@ -0,0 +1,73 @@
+import multiprocessing
+import time
+
+import pertdb
+import pytest
+
+
+def test_deferred_standardization():
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping SMILES normalization tests.")
+
+    pertdb.settings.defer_standardization = True
+    try:
+        compound = pertdb.Compound(
+            name="Deferred sodium butyrate", smiles="CCCC(=O)[O-].[Na+]"
+        ).save()
+    finally:
+        pertdb.settings.defer_standardization = False
+    assert compound.standardization_pending
+    assert compound.canonical_smiles is None
+
+    future = pertdb.Compound.standardize_pending(n_jobs=1, background=True)
+    assert future.result() >= 1
+
+    compound.refresh_from_db()
+    assert not compound.standardization_pending
+    assert compound.canonical_smiles == "CCCC(=O)O"
+    assert compound.molformula == "C4H8O2"
+    assert pertdb.Compound.standardize_pending(n_jobs=1) == 0
+    compound.delete(permanent=True)
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="workers only see functions patched in tests when forked",
+)
+def test_restandardize_after_timeout(monkeypatch):
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping SMILES normalization tests.")
+
+    from pertdb import _standardize
+
+    pertdb.settings.defer_standardization = True
+    try:
+        compound = pertdb.Compound(
+            name="Deferred isopropylamine", smiles="CC(C)N"
+        ).save()
+    finally:
+        pertdb.settings.defer_standardization = False
+
+    compute_fields = _standardize.compute_fields
+
+    def stall(smiles):
+        if smiles == "CC(C)N":
+            time.sleep(60)
+        return compute_fields(smiles)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(_standardize, "compute_fields", stall)
+        patch.setattr(pertdb.settings, "standardization_timeout", 1)
+        pertdb.Compound.standardize_pending(n_jobs=2)
+    compound.refresh_from_db()
+    assert not compound.standardization_pending
+    assert compound.canonical_smiles is None
+    # timeouts aren't stamped with versions, hence, they're retried
+    assert compound.standardizer_version is None
+    assert compound.rdkit_version is None
+
+    assert pertdb.Compound.restandardize(n_jobs=1) >= 1
+    compound.refresh_from_db()
+    assert compound.canonical_smiles == "CC(C)N"
+    assert compound.standardizer_version is not None
+    compound.delete(permanent=True)
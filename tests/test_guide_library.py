@@ -0,0 +1,82 @@
+import bionty as bt
+import pandas as pd
+import pertdb
+import pytest
+
+
+def test_load_guide_library(tmp_path):
+    if not bt.Organism.filter(name="human").exists():
+        bt.Organism(
+            name="human", ontology_id="NCBITaxon:9606", _skip_validation=True
+        ).save()
+    human = bt.Organism.get(name="human")
+    existing_gene = bt.Gene(symbol="A1BG", organism=human, _skip_validation=True).save()
+    bt.Gene(symbol="A1CF", organism=human, _skip_validation=True).save()
+    library = pd.DataFrame(
+        {
+            "Target Gene Symbol": [
+                "A1BG",
+                "A1BG",
+                "A1CF",
+                "A1CF",
+                None,
+                "Non-Targeting Control",
+                "NOTAGENE1",
+            ],
+            "sgRNA Target Sequence": [
+                "CATCTTCTTTCACCTGAACG",
+                "CTCCGGGGAGAACTCCGGCG",
+                "AAGTTGCTTGATTGCATTGG",
+                "CGTGCGGCGGTTGCAGCCAA",
+                "ACGGAGGCTAAGCGTCGCAA",
+                "ATCGTTTCCGCTTAACGGCG",
+                "GTAGCGAACGTGTCCGGCGT",
+            ],
+            "Rule Set 2 score": [0.617, 0.522, 0.658, 0.537, None, None, 0.5],
+        }
+    )
+    library.to_csv(tmp_path / "library.csv", index=False)
+
+    assert pertdb.io.load_guide_library(tmp_path / "library.csv", chunk_size=2) == 7
+    guide = pertdb.GeneticPerturbation.filter_by_sequence("AAGTTGCTTGATTGCATTGG").one()
+    assert guide.name == "A1CF_AAGTTGCTTGATTGCATTGG"
+    assert guide.type == "CRISPR-Cas9"
+    assert guide.on_target_score == 0.658
+    target = guide.targets.get()
+    assert target.name == "A1CF"
+    assert target.genes.get().symbol == "A1CF"
+    # existing genes are reused
+    a1bg_target = pertdb.PerturbationTarget.get(name="A1BG")
+    assert a1bg_target.genes.get() == existing_gene
+    assert a1bg_target.genetic_perturbations.count() == 2
+    non_targeting = pertdb.GeneticPerturbation.get(name="ACGGAGGCTAAGCGTCGCAA")
+    assert not non_targeting.targets.exists()
+    # control labels are non-targeting guides
+    control = pertdb.GeneticPerturbation.get(name="ATCGTTTCCGCTTAACGGCG")
+    assert not control.targets.exists()
+    assert not pertdb.PerturbationTarget.filter(name="Non-Targeting Control").exists()
+    # symbols that aren't genes get neither genes nor targets
+    unknown = pertdb.GeneticPerturbation.get(name="NOTAGENE1_GTAGCGAACGTGTCCGGCGT")
+    assert not unknown.targets.exists()
+    assert not bt.Gene.filter(symbol="NOTAGENE1").exists()
+    assert not pertdb.PerturbationTarget.filter(name="NOTAGENE1").exists()
+
+    # loading the library again doesn't create duplicates
+    guides = pertdb.GeneticPerturbation.from_guides_bulk(
+        sequences=["CATCTTCTTTCACCTGAACG"], genes=["A1BG"]
+    )
+    assert guides[0].on_target_score == 0.617
+    assert pertdb.GeneticPerturbation.filter(name__startswith="A1").count() == 4
+
+    pertdb.GeneticPerturbation.filter_by_sequence(
+        library["sgRNA Target Sequence"]
+    ).delete(permanent=True)
+    pertdb.PerturbationTarget.filter(name__in=["A1BG", "A1CF"]).delete(permanent=True)
+    bt.Gene.filter(symbol__in=["A1BG", "A1CF"], organism=human).delete(permanent=True)
+
+
+def test_from_guides_bulk_lengths():
+    with pytest.raises(ValueError, match="got 1 genes but 2 sequences"):
+        pertdb.GeneticPerturbation.from_guides_bulk(
+            sequences=["CATCTTCTTTCACCTGAACG", "CTCCGGGGAGAACTCCGGCG"], genes=["A1BG"]
+        )
@@ -0,0 +1,39 @@
+import pertdb
+from pertdb._hashing import hash64
+
+
+def test_compound_canonical_smiles_hash():
+    compound = pertdb.Compound(name="Butyric acid", smiles="CCCC(=O)[O-].[Na+]").save()
+    assert compound.canonical_smiles == "CCCC(=O)O"
+    assert compound.canonical_smiles_hash == hash64("CCCC(=O)O")
+    (bulk_compound,) = pertdb.Compound.from_smiles_bulk(
+        names=["Isobutanol"], smiles=["CC(C)CO"]
+    )
+    assert bulk_compound.canonical_smiles_hash == hash64("CC(C)CO")
+
+    found = pertdb.Compound.filter_by_canonical_smiles("CCCC(=O)O").one()
+    assert found == compound
+    found = pertdb.Compound.filter_by_canonical_smiles(["CCCC(=O)O", "CC(C)CO"])
+    assert set(found) == {compound, bulk_compound}
+    assert not pertdb.Compound.filter_by_canonical_smiles("CCCCC(=O)O").exists()
+
+    compound.delete(permanent=True)
+    bulk_compound.delete(permanent=True)
+
+
+def test_genetic_perturbation_sequence_hash():
+    perturbation = pertdb.GeneticPerturbation(
+        name="hash test guide", sequence="AGCTGACCGTGAAGCTGACC"
+    ).save()
+    assert perturbation.sequence_hash == hash64("AGCTGACCGTGAAGCTGACC")
+    found = pertdb.GeneticPerturbation.filter_by_sequence("AGCTGACCGTGAAGCTGACC")
+    assert found.one() == perturbation
+
+    perturbation.sequence = "TTGGTGGTGAACT"
+    perturbation.save()
+    assert not pertdb.GeneticPerturbation.filter_by_sequence(
+        "AGCTGACCGTGAAGCTGACC"
+    ).exists()
+    assert pertdb.GeneticPerturbation.filter_by_sequence("TTGGTGGTGAACT").exists()
+
+    perturbation.delete(permanent=True)
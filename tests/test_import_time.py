@@ -0,0 +1,59 @@
+import json
+import subprocess
+import sys
+
+import pertdb
+
+
+def _import_time(code: str) -> float:
+    # import in a fresh interpreter so that nothing is cached in sys.modules
+    script = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _imported_packages(code: str) -> set[str]:
+    script = f"import json, sys\n{code}\nprint(json.dumps(sorted(sys.modules)))\n"
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    modules = json.loads(result.stdout.strip().splitlines()[-1])
+    return {module.partition(".")[0] for module in modules}
+
+
+def test_import_is_lazy():
+    # packages loaded at interpreter startup, e.g., by site customizations
+    startup_packages = _imported_packages("")
+    packages = _imported_packages(
+        "import pertdb\nfrom pertdb.types import BiologicType"
+    )
+    heavy_packages = {"bionty", "django", "lamindb", "lamindb_setup", "rdkit"}
+    assert not (packages - startup_packages) & heavy_packages
+    import_time = _import_time("import pertdb")
+    registry_time = _import_time("import pertdb\npertdb.Compound")
+    print(f"import pertdb: {import_time:.3f}s")
+    print(f"import pertdb & access pertdb.Compound: {registry_time:.3f}s")
+
+
+def test_import_does_not_load_rdkit():
+    import_time = _import_time(
+        "import sys, pertdb.models\nassert 'rdkit' not in sys.modules"
+    )
+    print(f"import pertdb.models: {import_time:.3f}s")
+    if getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        rdkit_time = _import_time(
+            "from rdkit import Chem\n"
+            "from rdkit.Chem import Descriptors\n"
+            "from rdkit.Chem.MolStandardize import rdMolStandardize\n"
+            "from rdkit.Chem.rdMolDescriptors import CalcMolFormula"
+        )
+        print(f"deferred RDKit imports: {rdkit_time:.3f}s")
+        # standardization loads RDKit on first use
+        assert pertdb.Compound.standardize_smiles("CC(=O)[O-].[Na+]") == "CC(=O)O"
@@ -0,0 +1,25 @@
+import pertdb
+import pytest
+
+
+def test_filter_by_inchikey_skeleton():
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping SMILES normalization tests.")
+
+    s_butanol = pertdb.Compound(name="(S)-2-Butanol", smiles="C[C@H](O)CC").save()
+    r_butanol, tert_butylamine = pertdb.Compound.from_smiles_bulk(
+        names=["(R)-2-Butanol", "tert-Butylamine"],
+        smiles=["C[C@@H](O)CC", "CC(C)(C)N"],
+    )
+    assert s_butanol.inchikey != r_butanol.inchikey
+    assert s_butanol.inchikey_skeleton == "BTANRVKWQNVYAZ"
+    assert r_butanol.inchikey_skeleton == "BTANRVKWQNVYAZ"
+
+    enantiomers = pertdb.Compound.filter_by_inchikey_skeleton(s_butanol.inchikey)
+    assert set(enantiomers) == {s_butanol, r_butanol}
+    found = pertdb.Compound.filter_by_inchikey_skeleton(
+        ["BTANRVKWQNVYAZ", tert_butylamine.inchikey]
+    )
+    assert set(found) == {s_butanol, r_butanol, tert_butylamine}
+    for compound in (s_butanol, r_butanol, tert_butylamine):
+        compound.delete(permanent=True)
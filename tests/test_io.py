@@ -0,0 +1,140 @@
+import sqlite3
+
+import pandas as pd
+import pertdb
+import pytest
+
+
+def test_load_compounds_from_csv_and_parquet(tmp_path):
+    df = pd.DataFrame(
+        {
+            "compound": ["Pyridine", "Acetone", None, "Bad"],
+            "structure": ["c1ccncc1", "CC(C)=O", "CCOC(C)=O", "not a smiles"],
+            "chembl": ["CHEMBL266158", "CHEMBL14253", None, None],
+            "mechanism": ["solvent", "solvent", None, None],
+        }
+    )
+    df.to_csv(tmp_path / "compounds.csv", index=False)
+    chunks = list(pertdb.io.iter_chunks(tmp_path / "compounds.csv", chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+
+    n_rows = pertdb.io.load_compounds(
+        tmp_path / "compounds.csv",
+        name_column="compound",
+        smiles_column="structure",
+        chembl_id_column="chembl",
+        columns={"moa": "mechanism"},
+        chunk_size=3,
+        n_jobs=1,
+    )
+    assert n_rows == 4
+    pyridine = pertdb.Compound.filter_by_canonical_smiles("c1ccncc1").one()
+    assert pyridine.name == "Pyridine"
+    assert pyridine.chembl_id == "CHEMBL266158"
+    assert pyridine.moa == "solvent"
+    # unnamed compounds are named by their SMILES
+    assert pertdb.Compound.filter(name="CCOC(C)=O").one().canonical_smiles is not None
+
+    # loading the same compounds again doesn't create duplicates
+    df.to_parquet(tmp_path / "compounds.parquet", row_group_size=2)
+    pertdb.io.load_compounds(
+        tmp_path / "compounds.parquet",
+        name_column="compound",
+        smiles_column="structure",
+        chunk_size=2,
+        n_jobs=1,
+    )
+    assert pertdb.Compound.filter_by_canonical_smiles("c1ccncc1").count() == 1
+    pertdb.Compound.filter(name__in=["Pyridine", "Acetone", "CCOC(C)=O", "Bad"]).delete(
+        permanent=True
+    )
+
+
+def test_load_compounds_from_sdf(tmp_path):
+    from rdkit import Chem
+
+    with Chem.SDWriter(str(tmp_path / "compounds.sdf")) as writer:
+        for name, smiles, chembl_id in [
+            ("Cyclohexane", "C1CCCCC1", "CHEMBL15980"),
+            ("Ethylamine", "CCN", "CHEMBL14449"),
+        ]:
+            mol = Chem.MolFromSmiles(smiles)
+            mol.SetProp("_Name", name)
+            mol.SetProp("chembl_id", chembl_id)
+            writer.write(mol)
+
+    (chunk,) = pertdb.io.iter_sdf(tmp_path / "compounds.sdf")
+    assert chunk["_Name"].tolist() == ["Cyclohexane", "Ethylamine"]
+    pertdb.io.load_compounds(
+        tmp_path / "compounds.sdf", chembl_id_column="chembl_id", n_jobs=1
+    )
+    ethylamine = pertdb.Compound.filter(name="Ethylamine").one()
+    assert ethylamine.canonical_smiles == "CCN"
+    assert ethylamine.chembl_id == "CHEMBL14449"
+    pertdb.Compound.filter(chembl_id__in=["CHEMBL15980", "CHEMBL14449"]).delete(
+        permanent=True
+    )
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError, match="unsupported format"):
+        pertdb.io.iter_chunks(tmp_path / "compounds.xlsx")
+
+
+def _write_chembl_dump(path):
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE molecule_dictionary "
+            "(molregno INTEGER PRIMARY KEY, pref_name TEXT, chembl_id TEXT)"
+        )
+        conn.execute(
+            "CREATE TABLE compound_structures "
+            "(molregno INTEGER PRIMARY KEY, canonical_smiles TEXT)"
+        )
+        molecules = [
+            (3, "OCTANE", "CHEMBL134886", "CCCCCCCC"),
+            (7, None, "CHEMBL26394", "CCCCCCCCO"),
+            (12, "ACETAMIDE", "CHEMBL16081", "CC(N)=O"),
+            (15, "GLYCINE", "CHEMBL773", "NCC(=O)O"),
+        ]
+        conn.executemany(
+            "INSERT INTO molecule_dictionary VALUES (?, ?, ?)",
+            [(molregno, name, chembl_id) for molregno, name, chembl_id, _ in molecules],
+        )
+        conn.executemany(
+            "INSERT INTO compound_structures VALUES (?, ?)",
+            [(molregno, smiles) for molregno, _, _, smiles in molecules],
+        )
+        # molecules without structure, e.g., biologics, are skipped
+        conn.execute("INSERT INTO molecule_dictionary VALUES (20, 'INSULIN', 'X1')")
+
+
+def test_load_chembl_resumes(tmp_path, monkeypatch):
+    path = tmp_path / "chembl_test.db"
+    _write_chembl_dump(path)
+    from_smiles_bulk = pertdb.Compound.from_smiles_bulk
+    calls = []
+
+    def crash_on_second_chunk(*args, **kwargs):
+        calls.append(kwargs["chembl_id"])
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        return from_smiles_bulk(*args, **kwargs)
+
+    monkeypatch.setattr(pertdb.Compound, "from_smiles_bulk", crash_on_second_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        pertdb.io.load_chembl(path, chunk_size=2, n_jobs=1)
+    monkeypatch.setattr(pertdb.Compound, "from_smiles_bulk", from_smiles_bulk)
+    assert pertdb.Compound.filter(chembl_id="CHEMBL26394").one().name == "CHEMBL26394"
+    assert not pertdb.Compound.filter(chembl_id="CHEMBL16081").exists()
+
+    # the second call starts with the chunk that failed
+    assert pertdb.io.load_chembl(path, chunk_size=2, n_jobs=1) == 2
+    acetamide = pertdb.Compound.filter(chembl_id="CHEMBL16081").one()
+    assert acetamide.name == "ACETAMIDE"
+    assert acetamide.ontology_id == "CHEMBL16081"
+    assert acetamide.canonical_smiles == "CC(N)=O"
+    assert not pertdb.Compound.filter(chembl_id="X1").exists()
+    pertdb.Compound.filter(
+        chembl_id__in=["CHEMBL134886", "CHEMBL26394", "CHEMBL16081", "CHEMBL773"]
+    ).delete(permanent=True)
@@ -0,0 +1,68 @@
+import numpy as np
+import pertdb
+import pytest
+from pertdb._offtargets import score_guides
+from pertdb._sequences import reverse_complement
+
+
+def _write_fasta(path, chromosomes, line_bases=60):
+    fai = []
+    with open(path, "w") as f:
+        for name, sequence in chromosomes.items():
+            f.write(f">{name}\n")
+            fai.append(
+                f"{name}\t{len(sequence)}\t{f.tell()}\t{line_bases}\t{line_bases + 1}"
+            )
+            for i in range(0, len(sequence), line_bases):
+                f.write(sequence[i : i + line_bases] + "\n")
+    (path.parent / f"{path.name}.fai").write_text("\n".join(fai) + "\n")
+
+
+def _plant(sequence, position, site):
+    return sequence[:position] + site + sequence[position + len(site) :]
+
+
+@pytest.fixture(scope="module")
+def genome(tmp_path_factory):
+    rng = np.random.default_rng(25)
+    guides = ["".join(rng.choice(list("ACGT"), 20)) for _ in range(4)]
+    chr1, chr2 = ("".join(rng.choice(list("ACGT"), 5_000)) for _ in range(2))
+    # on-target site of the first guide and an off-target with 2 mismatches
+    chr1 = _plant(chr1, 100, guides[0] + "AGG")
+    off_target = list(guides[0])
+    for i in (2, 9):
+        off_target[i] = "A" if off_target[i] != "A" else "C"
+    chr2 = _plant(chr2, 3_000, reverse_complement("".join(off_target) + "TGG"))
+    # the second guide only matches the reverse strand
+    chr1 = _plant(chr1, 1_000, reverse_complement(guides[1] + "CGG"))
+    # the third guide matches twice, once in soft-masked sequence
+    chr1 = _plant(chr1, 2_000, guides[2] + "GGG")
+    chr2 = _plant(chr2, 500, (guides[2] + "AGG").lower())
+    path = tmp_path_factory.mktemp("genome") / "genome.fa"
+    _write_fasta(path, {"chr1": chr1, "chr2": chr2})
+    return path, guides
+
+
+def test_score_guides(genome):
+    path, guides = genome
+    scores = score_guides(path, guides, n_jobs=1, block_size=97)
+    hit = (1 - 0.014) * (1 - 0.079) / ((19 - 7) / 19 * 4 + 1) / 2**2
+    assert scores[0] == pytest.approx(100 * hit / (1 + hit))
+    assert scores[1:].tolist() == [0, 50, 0]
+    # mismatches beyond max_mismatches aren't off-targets
+    assert score_guides(path, guides, max_mismatches=1, n_jobs=1)[0] == 0
+    with pytest.raises(ValueError, match="guides must have 20 bases"):
+        score_guides(path, ["ACGT"])
+
+
+def test_score_off_targets(genome):
+    path, guides = genome
+    pertdb.GeneticPerturbation.from_guides_bulk(
+        guides, [None] * 4, names=[f"offtarget {i}" for i in range(4)]
+    )
+    queryset = pertdb.GeneticPerturbation.filter(name__startswith="offtarget ")
+    assert pertdb.GeneticPerturbation.score_off_targets(path, queryset, n_jobs=2) == 4
+    scores = dict(queryset.values_list("name", "off_target_score"))
+    assert scores["offtarget 0"] == pytest.approx(6.05, abs=0.01)
+    assert scores["offtarget 2"] == 50
+    queryset.delete(permanent=True)
@@ -0,0 +1,64 @@
+import numpy as np
+import pertdb
+import pytest
+from pertdb._sequences import decode_2bit, pack_sequence, unpack_sequence
+
+
+def test_pack_sequence():
+    blob = pack_sequence("ACGTNacgu")
+    assert len(blob) == 4 + 2 * 3
+    assert unpack_sequence(blob) == "ACGTNACGT"
+
+
+def test_export_packed_sequences():
+    sequences = ["GGATCCTAGCTAGGCTAACG", "TTAGCNGCTAGGATCGATCG", "CCATGGTTAACCGGTTAA"]
+    pertdb.settings.pack_sequences = True
+    try:
+        packed_guide = pertdb.GeneticPerturbation(
+            name="packed guide", sequence=sequences[0]
+        ).save()
+    finally:
+        pertdb.settings.pack_sequences = False
+    assert unpack_sequence(packed_guide.sequence_packed) == sequences[0]
+    # saving without the setting keeps the packed sequence
+    loaded_guide = pertdb.GeneticPerturbation.get(id=packed_guide.id)
+    loaded_guide.on_target_score = 0.5
+    loaded_guide.save()
+    loaded_guide.refresh_from_db()
+    assert unpack_sequence(loaded_guide.sequence_packed) == sequences[0]
+    # unless the sequence changed
+    loaded_guide.sequence = sequences[2]
+    loaded_guide.save()
+    loaded_guide.refresh_from_db()
+    assert loaded_guide.sequence_packed is None
+    loaded_guide.sequence = sequences[0]
+    pertdb.settings.pack_sequences = True
+    try:
+        loaded_guide.save()
+    finally:
+        pertdb.settings.pack_sequences = False
+    guides = pertdb.GeneticPerturbation.from_guides_bulk(
+        sequences[1:], [None, None], names=["packed 1", "packed 2"]
+    )
+    assert guides[0].sequence_packed is None
+    queryset = pertdb.GeneticPerturbation.filter(name__startswith="packed ")
+
+    with pytest.raises(ValueError, match="sequences have lengths \\[18, 20\\]"):
+        pertdb.GeneticPerturbation.export_packed_sequences(queryset)
+    ids, packed, mask = pertdb.GeneticPerturbation.export_packed_sequences(
+        queryset, length=20
+    )
+    assert ids.tolist() == [packed_guide.id, guides[0].id]
+    assert packed.shape == mask.shape == (2, 5)
+    assert not packed.flags.owndata
+    assert packed.base is mask.base
+    assert decode_2bit(packed, mask, 20) == sequences[:2]
+
+    assert pertdb.GeneticPerturbation.backfill_packed_sequences() >= 2
+    guides[1].refresh_from_db()
+    assert unpack_sequence(guides[1].sequence_packed) == sequences[2]
+    _, packed_after_backfill, _ = pertdb.GeneticPerturbation.export_packed_sequences(
+        queryset, length=20
+    )
+    assert np.array_equal(packed_after_backfill, packed)
+    queryset.delete(permanent=True)
@@ -0,0 +1,75 @@
+import time
+
+import numpy as np
+import pertdb
+from pertdb._sequences import encode_2bit, hamming
+
+
+def test_hamming_on_2bit_encoding():
+    packed, mask = encode_2bit(["ACGTACGTA", "ACGAACGTN", "acguacgua"], 9)
+    assert packed.shape == (3, 3)
+    mismatches = hamming(packed, mask, packed[0], mask[0])
+    assert mismatches.tolist() == [0, 2, 0]
+
+
+def test_search_sequence():
+    rng = np.random.default_rng(22)
+    sequences = ["".join(rng.choice(list("ACGT"), 20)) for _ in range(2_000)]
+    guides = pertdb.GeneticPerturbation.from_guides_bulk(
+        sequences, [None] * len(sequences), names=[f"search {s}" for s in sequences]
+    )
+    query = list(sequences[0])
+    # mismatches in three of the four seeds
+    for i in (1, 7, 13):
+        query[i] = "A" if query[i] != "A" else "C"
+    query = "".join(query)
+
+    start = time.perf_counter()
+    hits = pertdb.GeneticPerturbation.search_sequence(query, max_mismatches=3)
+    print(f"\nsearched {len(sequences)} guides in {time.perf_counter() - start:.4f}s")
+    assert hits[0] == (guides[0], 3)
+    assert all(mismatches <= 3 for _, mismatches in hits)
+    assert pertdb.GeneticPerturbation.search_sequence(query, max_mismatches=2) == [
+        (g, m) for g, m in hits if m <= 2
+    ]
+    # too many mismatches for the seeds fall back to comparing all sequences
+    hits = pertdb.GeneticPerturbation.search_sequence(query, max_mismatches=4)
+    assert (guides[0], 3) in hits
+
+    # seeds follow changes of the sequence
+    guide = guides[1]
+    guide.sequence = query
+    guide.save()
+    assert pertdb.GeneticPerturbation.search_sequence(query, max_mismatches=0) == [
+        (guide, 0)
+    ]
+    assert pertdb.GeneticPerturbationSeed.filter(perturbation=guide).count() == 4
+
+    pertdb.GeneticPerturbationSeed.filter(perturbation=guide).delete()
+    assert pertdb.GeneticPerturbation.backfill_seeds() == 1
+    assert guide.seeds.count() == 4
+    pertdb.GeneticPerturbation.filter(name__startswith="search ").delete(permanent=True)
+
+
+def test_load_deferred_sequence_hash():
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    sequences = ["GACCTTAGGCATCGATCGTA", "TTGACCAGTAGCCATGACGT", "CAGGTACCTGATCGAATGCA"]
+    pertdb.GeneticPerturbation.from_guides_bulk(
+        sequences, [None] * 3, names=[f"deferred {s}" for s in sequences]
+    )
+    queryset = pertdb.GeneticPerturbation.filter(name__startswith="deferred ")
+    with CaptureQueriesContext(connection) as context:
+        guides = list(queryset.only("id", "sequence"))
+    assert len(guides) == 3
+    assert len(context.captured_queries) == 1
+
+    # the deferred hash is loaded on save to tell whether the sequence changed
+    guide = guides[0]
+    guide.sequence = sequences[1]
+    guide.save()
+    assert set(guide.seeds.values_list("offset", "kmer")) == set(
+        guides[1].seeds.values_list("offset", "kmer")
+    )
+    queryset.delete(permanent=True)
@@ -1,3 +1,7 @@
+import multiprocessing
+import os
+import time
+
 import pertdb
 import pytest
 
@@ -49,3 +53,104 @@ def test_smiles_normalization_on_update():
     assert c.inchikey is not None and len(c.inchikey) > 0
     assert c.molweight is not None and c.molweight > 0
     assert c.molformula is not None and len(c.molformula) > 0
+
+
+def test_standardize_smiles_batch():
+    """
+    standardize_smiles_batch() should match the per-object path in input order.
+    """
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping SMILES normalization tests.")
+
+    smiles = ["CC(=O)[O-].[Na+]", "not a smiles", "CC(C)(C)O", None]
+    results = pertdb.Compound.standardize_smiles_batch(smiles, n_jobs=2)
+
+    assert len(results) == len(smiles)
+    assert results[0]["canonical_smiles"] == "CC(=O)O"
+    assert results[0]["molformula"] == "C2H4O2"
+    assert results[1] is None
+    assert results[2]["canonical_smiles"] == "CC(C)(C)O"
+    assert results[3] is None
+    c = pertdb.Compound(name="Batch test", smiles="CC(C)(C)O")
+    assert c.inchikey == results[2]["inchikey"]
+    assert c.molweight == results[2]["molweight"]
+
+
+def test_standardizer_settings():
+    """
+    The standardizer is reused within a thread and rebuilt when settings change.
+    """
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping SMILES normalization tests.")
+
+    from pertdb._standardize import get_standardizer
+
+    standardizer = get_standardizer()
+    assert get_standardizer() is standardizer
+
+    max_tautomers = pertdb.settings.max_tautomers
+    pertdb.settings.max_tautomers = 10
+    try:
+        assert get_standardizer() is not standardizer
+        assert get_standardizer().params.maxTautomers == 10
+        assert pertdb.Compound.standardize_smiles("Oc1ccccn1") == "O=c1cccc[nH]1"
+    finally:
+        pertdb.settings.max_tautomers = max_tautomers
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="workers only see descriptors registered in tests when forked",
+)
+def test_standardize_smiles_batch_timeout():
+    """
+    A SMILES exceeding the timeout falls back to None instead of stalling the batch.
+    """
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping SMILES normalization tests.")
+
+    from pertdb._standardize import DESCRIPTORS, register_descriptor
+
+    @register_descriptor("stall")
+    def _stall(mol):
+        if mol.GetNumAtoms() == 4:
+            time.sleep(60)
+
+    try:
+        results = pertdb.Compound.standardize_smiles_batch(
+            ["CCO", "CCCO", "CCCCO"], n_jobs=2, timeout=1
+        )
+    finally:
+        del DESCRIPTORS["stall"]
+    assert results[0]["canonical_smiles"] == "CCO"
+    assert results[1] is None
+    assert results[2]["canonical_smiles"] == "CCCCO"
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="workers only see descriptors registered in tests when forked",
+)
+def test_standardize_smiles_batch_crash():
+    """
+    A SMILES that kills its worker process doesn't fail the batch.
+    """
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping SMILES normalization tests.")
+
+    from pertdb._standardize import DESCRIPTORS, register_descriptor
+
+    @register_descriptor("crash")
+    def _crash(mol):
+        if mol.GetNumAtoms() == 4:
+            os._exit(1)
+
+    try:
+        results = pertdb.Compound.standardize_smiles_batch(
+            ["CCO", "CCCO", "CCCCO"], n_jobs=2
+        )
+    finally:
+        del DESCRIPTORS["crash"]
+    assert results[0]["canonical_smiles"] == "CCO"
+    assert results[1] is None
+    assert results[2]["canonical_smiles"] == "CCCCO"
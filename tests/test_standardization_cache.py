@@ -0,0 +1,71 @@
+import sqlite3
+
+import pertdb
+import pytest
+from pertdb._cache import StandardizationCache, get_cache
+from pertdb._standardize import field_names
+
+
+@pytest.fixture
+def cache_enabled(tmp_path, monkeypatch):
+    if not getattr(pertdb.models, "RDKIT_AVAILABLE", False):
+        pytest.skip("RDKit not available; skipping SMILES normalization tests.")
+    monkeypatch.setenv("LAMIN_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pertdb.settings, "cache_standardization", True)
+    yield
+    get_cache(field_names()).clear()
+
+
+def test_standardization_cache_roundtrip(cache_enabled):
+    smiles = ["CC(=O)[O-].[Na+]", "CC(C)(C)O", "CC(=O)[O-].[Na+]", "invalid"]
+    results = pertdb.Compound.standardize_smiles_batch(smiles, n_jobs=1)
+
+    cache = get_cache(field_names())
+    hits = cache.get_many(smiles)
+    assert set(hits) == {"CC(=O)[O-].[Na+]", "CC(C)(C)O"}
+    assert hits["CC(=O)[O-].[Na+]"] == results[0]
+    assert pertdb.Compound.standardize_smiles_batch(smiles, n_jobs=1) == results
+
+    # a different standardizer configuration doesn't see the cached entries
+    pertdb.settings.max_tautomers = 10
+    try:
+        assert get_cache(field_names()).get_many(smiles) == {}
+    finally:
+        pertdb.settings.max_tautomers = 1000
+
+
+def test_standardization_cache_eviction(tmp_path):
+    cache = StandardizationCache(tmp_path / "cache.sqlite", max_entries=2, namespace="")
+    cache.set_many({"C": {"canonical_smiles": "C"}})
+    cache.set_many({"CC": {"canonical_smiles": "CC"}})
+    cache.get_many(["C"])  # marks "C" as recently used
+    cache.set_many({"CCC": {"canonical_smiles": "CCC"}})
+    assert set(cache.get_many(["C", "CC", "CCC"])) == {"C", "CCC"}
+
+
+def test_standardization_cache_statements(tmp_path, monkeypatch):
+    statements = []
+    connect = sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(sqlite3, "connect", traced_connect)
+    cache = StandardizationCache(
+        tmp_path / "cache.sqlite", max_entries=10, namespace=""
+    )
+    for i in range(1, 12):
+        cache.set_many({"C" * i: {"canonical_smiles": "C" * i}})
+    # counted once initially and once when the bound is exceeded
+    assert sum("COUNT(*)" in s for s in statements) == 2
+    # evicted down to 90% of the bound
+    assert len(cache.get_many(["C" * i for i in range(1, 12)])) == 9
+
+    # hits don't write until the next insert
+    statements.clear()
+    cache.get_many(["CCCCCCCCCCC"])
+    assert not any(s.startswith("UPDATE") for s in statements)
+    cache.set_many({"N": {"canonical_smiles": "N"}})
+    assert any(s.startswith("UPDATE") for s in statements)